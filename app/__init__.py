@@ -1,10 +1,37 @@
 import os
+import secrets
+from functools import partial
 
 from dotenv import load_dotenv
 from flask import Flask
+from sqlalchemy.orm import Session
 
-from .api import api_bp
+from .api import SYNC_PAGE_MAX, _build_summary_payload, _changes_after, _encode_cursor, api_bp
+from .admission import DEFAULT_ENDPOINT_CLASSES, DEFAULT_POOLS, AdmissionController
+from .events import ChangeFeed, EventBroker
 from .extensions import db
+from .group_commit import GroupCommitter
+from .health import DatabaseHeartbeat
+from .migrations import upgrade_schema
+from .profiling import RequestProfiler, init_profiling
+from .routing import ReplicaRouter, make_extra_engine
+from .sharding import ShardRouter
+from .singleflight import SingleFlight
+from .snapshots import DEFAULT_ROLLUPS, Snapshotter
+
+
+def _env_list(name: str) -> list[str]:
+    return [v.strip() for v in os.environ.get(name, "").split(",") if v.strip()]
+
+
+def _engine_options() -> dict:
+    """Pool sizing from the environment (set by gunicorn.conf.py from the CPU and connection budget)."""
+    options = {}
+    if os.environ.get("DB_POOL_SIZE"):
+        options["pool_size"] = int(os.environ["DB_POOL_SIZE"])
+    if os.environ.get("DB_MAX_OVERFLOW"):
+        options["max_overflow"] = int(os.environ["DB_MAX_OVERFLOW"])
+    return options
 
 
 def create_app(test_config: dict | None = None) -> Flask:
@@ -22,19 +49,196 @@ def create_app(test_config: dict | None = None) -> Flask:
     app.config.from_mapping(
         SQLALCHEMY_DATABASE_URI=os.environ.get("DATABASE_URL", "sqlite:///inventory.db"),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_ENGINE_OPTIONS=_engine_options(),
         JSON_AS_ASCII=False,  # Отключаем экранирование Unicode для читаемого JSON
+        # Signs the read-your-writes cookie. The random fallback is shared by the workers of
+        # one pre-fork master only; set SECRET_KEY when running several hosts.
+        SECRET_KEY=os.environ.get("SECRET_KEY") or secrets.token_hex(32),
+        # Read replicas: GET endpoints are served from these, writes go to the primary.
+        SQLALCHEMY_REPLICA_URIS=_env_list("DATABASE_REPLICA_URLS"),
+        REPLICA_READ_YOUR_WRITES_SECONDS=float(os.environ.get("REPLICA_READ_YOUR_WRITES_SECONDS", "5")),
+        REPLICA_HEALTH_CHECK_SECONDS=float(os.environ.get("REPLICA_HEALTH_CHECK_SECONDS", "10")),
+        # Sharding of items across several databases (see app/sharding.py).
+        SHARD_URIS=_env_list("SHARD_DATABASE_URLS"),
+        SHARD_STRATEGY=os.environ.get("SHARD_STRATEGY", "category"),
+        SHARD_ID_SPAN=int(os.environ.get("SHARD_ID_SPAN", "100000000")),
+        # Request threads per process (set by gunicorn.conf.py); sizes the scatter-gather pool.
+        SHARD_REQUEST_THREADS=int(os.environ.get("WEB_THREADS", "8")),
+        # Group commit: batch concurrent create/update calls into one transaction (opt-in).
+        GROUP_COMMIT_ENABLED=os.environ.get("GROUP_COMMIT_ENABLED", "0") == "1",
+        GROUP_COMMIT_WINDOW_MS=float(os.environ.get("GROUP_COMMIT_WINDOW_MS", "5")),
+        GROUP_COMMIT_MAX_BATCH=int(os.environ.get("GROUP_COMMIT_MAX_BATCH", "64")),
+        # Periodic summary snapshots for /reports/timeseries (0 disables the background thread).
+        SNAPSHOT_INTERVAL_SECONDS=int(os.environ.get("SNAPSHOT_INTERVAL_SECONDS", "0")),
+        SNAPSHOT_ROLLUPS=DEFAULT_ROLLUPS,
+        SNAPSHOT_RETENTION_DAYS=int(os.environ.get("SNAPSHOT_RETENTION_DAYS", "1825")),
+        # SSE change feed (/events).
+        EVENTS_HISTORY_SIZE=int(os.environ.get("EVENTS_HISTORY_SIZE", "1000")),
+        EVENTS_BUFFER_SIZE=int(os.environ.get("EVENTS_BUFFER_SIZE", "100")),
+        EVENTS_KEEPALIVE_SECONDS=float(os.environ.get("EVENTS_KEEPALIVE_SECONDS", "15")),
+        EVENTS_LOW_STOCK_THRESHOLD=int(os.environ.get("EVENTS_LOW_STOCK_THRESHOLD", "5")),
+        # Each worker polls the delta-sync keyset this often for new events.
+        EVENTS_POLL_SECONDS=float(os.environ.get("EVENTS_POLL_SECONDS", "1")),
+        # Admission control: per-class concurrency and rate limits (see app/admission.py, opt-in).
+        ADMISSION_CONTROL_ENABLED=os.environ.get("ADMISSION_CONTROL_ENABLED", "0") == "1",
+        ADMISSION_POOLS=DEFAULT_POOLS,
+        ADMISSION_ENDPOINT_CLASSES=DEFAULT_ENDPOINT_CLASSES,
+        # Concurrent identical report requests share one computation.
+        REPORT_COALESCING_ENABLED=os.environ.get("REPORT_COALESCING_ENABLED", "1") == "1",
+        REPORT_COALESCING_TIMEOUT_SECONDS=float(os.environ.get("REPORT_COALESCING_TIMEOUT_SECONDS", "30")),
+        # /items/changes holds back changes younger than this, so transactions that commit late
+        # are not skipped; must exceed the longest write transaction.
+        SYNC_SAFETY_LAG_SECONDS=float(os.environ.get("SYNC_SAFETY_LAG_SECONDS", "5")),
+        # PATCH/DELETE /items: upper bound on rows one bulk request may change.
+        BULK_MAX_ROWS=int(os.environ.get("BULK_MAX_ROWS", "10000")),
+        # /readyz: background DB heartbeat; not ready when no successful probe for STALE seconds.
+        HEARTBEAT_INTERVAL_SECONDS=float(os.environ.get("HEARTBEAT_INTERVAL_SECONDS", "2")),
+        HEARTBEAT_STALE_SECONDS=float(os.environ.get("HEARTBEAT_STALE_SECONDS", "6")),
+        # create_all + upgrade_schema on startup; off for read-only tools such as generate_report.py.
+        AUTO_CREATE_SCHEMA=os.environ.get("AUTO_CREATE_SCHEMA", "1") == "1",
+        # The pre-fork server (gunicorn.conf.py) starts background threads in each worker instead.
+        START_BACKGROUND_THREADS=os.environ.get("START_BACKGROUND_THREADS", "1") == "1",
+        # Lock file electing the one worker that takes snapshots (default: <instance>/snapshotter.lock).
+        SNAPSHOT_LEADER_LOCK=os.environ.get("SNAPSHOT_LEADER_LOCK"),
+        # On-demand request profiling (see app/profiling.py); no hooks are installed when off.
+        PROFILING_ENABLED=os.environ.get("PROFILING_ENABLED", "0") == "1",
+        PROFILING_TOKEN=os.environ.get("PROFILING_TOKEN"),
+        PROFILING_SAMPLE_RATE=float(os.environ.get("PROFILING_SAMPLE_RATE", "0")),
+        PROFILING_ENDPOINTS=_env_list("PROFILING_ENDPOINTS"),
+        PROFILING_FORMAT=os.environ.get("PROFILING_FORMAT", "collapsed"),
+        PROFILING_SAMPLE_INTERVAL_MS=float(os.environ.get("PROFILING_SAMPLE_INTERVAL_MS", "5")),
+        PROFILING_DIR=os.environ.get("PROFILING_DIR"),
+        PROFILING_MAX_FILES=int(os.environ.get("PROFILING_MAX_FILES", "200")),
+        PROFILING_MAX_MB=float(os.environ.get("PROFILING_MAX_MB", "100")),
+        PROFILING_RETENTION_HOURS=float(os.environ.get("PROFILING_RETENTION_HOURS", "24")),
     )
 
     if test_config:
         app.config.update(test_config)
 
     db.init_app(app)
+    app.extensions["metrics"] = {}
+
+    if app.config["SQLALCHEMY_REPLICA_URIS"]:
+        router = ReplicaRouter(
+            {
+                f"replica_{n}": make_extra_engine(app, uri)
+                for n, uri in enumerate(app.config["SQLALCHEMY_REPLICA_URIS"])
+            },
+            pin_seconds=app.config["REPLICA_READ_YOUR_WRITES_SECONDS"],
+            health_interval=app.config["REPLICA_HEALTH_CHECK_SECONDS"],
+            secret_key=app.config["SECRET_KEY"],
+        )
+        router.watch()
+        app.extensions["replica_router"] = router
+        app.extensions["metrics"]["replicas"] = router.snapshot
+
+    if app.config["SHARD_URIS"]:
+        if app.config["SQLALCHEMY_REPLICA_URIS"] or app.config["GROUP_COMMIT_ENABLED"]:
+            raise ValueError("Sharding cannot be combined with read replicas or group commit.")
+        shards = ShardRouter(
+            [make_extra_engine(app, uri) for uri in app.config["SHARD_URIS"]],
+            strategy=app.config["SHARD_STRATEGY"],
+            id_span=app.config["SHARD_ID_SPAN"],
+            request_threads=app.config["SHARD_REQUEST_THREADS"],
+        )
+        app.extensions["shard_router"] = shards
+        app.extensions["metrics"]["shards"] = shards.snapshot
+
+    if app.config["GROUP_COMMIT_ENABLED"]:
+        committer = GroupCommitter(
+            lambda: Session(db.engine, expire_on_commit=False),
+            window_seconds=app.config["GROUP_COMMIT_WINDOW_MS"] / 1000,
+            max_batch=app.config["GROUP_COMMIT_MAX_BATCH"],
+        )
+        app.extensions["group_commit"] = committer
+        app.extensions["metrics"]["group_commit"] = committer.snapshot
+
+    if app.config["ADMISSION_CONTROL_ENABLED"]:
+        controller = AdmissionController(app.config["ADMISSION_POOLS"], app.config["ADMISSION_ENDPOINT_CLASSES"])
+        app.extensions["admission"] = controller
+        app.extensions["metrics"]["admission"] = controller.snapshot
+
+    if app.config["REPORT_COALESCING_ENABLED"]:
+        flight = SingleFlight(timeout=app.config["REPORT_COALESCING_TIMEOUT_SECONDS"])
+        app.extensions["report_flight"] = flight
+        app.extensions["metrics"]["report_coalescing"] = flight.snapshot
+
+    broker = EventBroker(
+        history_size=app.config["EVENTS_HISTORY_SIZE"],
+        max_buffer=app.config["EVENTS_BUFFER_SIZE"],
+        low_stock_threshold=app.config["EVENTS_LOW_STOCK_THRESHOLD"],
+    )
+    app.extensions["events"] = broker
+    app.extensions["metrics"]["events"] = broker.snapshot
+    app.extensions["event_feed"] = ChangeFeed(
+        app,
+        broker,
+        _changes_after,
+        encode=_encode_cursor,
+        interval=app.config["EVENTS_POLL_SECONDS"],
+        lag=app.config["SYNC_SAFETY_LAG_SECONDS"],
+        page_size=SYNC_PAGE_MAX,
+    )
+
+    snapshotter = Snapshotter(
+        app,
+        partial(_build_summary_payload, exact=True),
+        interval=app.config["SNAPSHOT_INTERVAL_SECONDS"] or 300,
+        rollups=app.config["SNAPSHOT_ROLLUPS"],
+        retention_seconds=app.config["SNAPSHOT_RETENTION_DAYS"] * 86400,
+    )
+    app.extensions["snapshotter"] = snapshotter
+
+    with app.app_context():
+        targets = {"primary": db.engine}
+    if "shard_router" in app.extensions:
+        targets.update({f"shard_{n}": e for n, e in enumerate(app.extensions["shard_router"].engines)})
+    replicas = app.extensions.get("replica_router")
+    heartbeat = DatabaseHeartbeat(
+        targets,
+        interval=app.config["HEARTBEAT_INTERVAL_SECONDS"],
+        stale_after=app.config["HEARTBEAT_STALE_SECONDS"],
+        on_beat=replicas.check_all if replicas else None,
+    )
+    app.extensions["heartbeat"] = heartbeat
+    app.extensions["metrics"]["heartbeat"] = heartbeat.status
+
+    if app.config["PROFILING_ENABLED"]:
+        profiler = RequestProfiler(
+            app.config["PROFILING_DIR"] or os.path.join(app.instance_path, "profiles"),
+            token=app.config["PROFILING_TOKEN"],
+            sample_rate=app.config["PROFILING_SAMPLE_RATE"],
+            endpoints=app.config["PROFILING_ENDPOINTS"],
+            fmt=app.config["PROFILING_FORMAT"],
+            interval=app.config["PROFILING_SAMPLE_INTERVAL_MS"] / 1000,
+            max_files=app.config["PROFILING_MAX_FILES"],
+            max_bytes=int(app.config["PROFILING_MAX_MB"] * 1024 * 1024),
+            retention_seconds=int(app.config["PROFILING_RETENTION_HOURS"] * 3600),
+        )
+        init_profiling(app, profiler)
+
+    @app.cli.command("snapshot")
+    def snapshot_command():
+        """Save one summary snapshot (for cron instead of the background thread)."""
+        snapshotter.run_once()
+        print("Snapshot saved.")
+
     app.register_blueprint(api_bp)
 
     # Auto-create tables for convenience in educational project.
     if not app.testing:
-        with app.app_context():
-            db.create_all()
+        if app.config["AUTO_CREATE_SCHEMA"]:
+            with app.app_context():
+                db.create_all()
+                upgrade_schema(db.engine)
+                if "shard_router" in app.extensions:
+                    app.extensions["shard_router"].prepare()
+        if app.config["START_BACKGROUND_THREADS"]:
+            heartbeat.start()
+            app.extensions["event_feed"].start()
+            if app.config["SNAPSHOT_INTERVAL_SECONDS"] > 0:
+                snapshotter.start()
 
     return app
 
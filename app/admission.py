@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+
+# Default endpoint classes. Endpoints not listed here (health, metrics, the SSE stream)
+# are never limited.
+DEFAULT_ENDPOINT_CLASSES = {
+    "api.root": "read",
+    "api.get_item": "read",
+    "api.item_changes": "read",
+    "api.report_timeseries": "read",
+    "api.report_top": "read",
+    "api.create_item": "write",
+    "api.update_item": "write",
+    "api.delete_item": "write",
+    "api.list_items": "heavy",
+    "api.report_summary": "heavy",
+    "api.bulk_update_items": "heavy",
+    "api.bulk_delete_items": "heavy",
+}
+
+# max_concurrent / rate (requests per second) / burst; None disables that limit.
+DEFAULT_POOLS = {
+    "read": {"max_concurrent": 64, "rate": None, "burst": None},
+    "write": {"max_concurrent": 32, "rate": None, "burst": None},
+    "heavy": {"max_concurrent": 4, "rate": 5.0, "burst": 10},
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+class AdmissionPool:
+    """
+    Concurrency limit plus optional token-bucket rate limit for one class of endpoints.
+
+    Requests over either limit are rejected immediately instead of queuing.
+    """
+
+    def __init__(self, name: str, *, max_concurrent: int | None, rate: float | None, burst: int | None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.bucket = TokenBucket(rate, burst or max(1, math.ceil(rate))) if rate else None
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._admitted = 0
+        self._rejected_concurrency = 0
+        self._rejected_rate = 0
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.max_concurrent is not None and self._in_flight >= self.max_concurrent:
+                self._rejected_concurrency += 1
+                raise Rejected(503, 1, f"Too many concurrent '{self.name}' requests.")
+            if self.bucket is not None:
+                wait = self.bucket.take()
+                if wait:
+                    self._rejected_rate += 1
+                    raise Rejected(429, wait, f"Rate limit for '{self.name}' requests exceeded.")
+            self._in_flight += 1
+            self._admitted += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrent": self.max_concurrent,
+                "rate": self.bucket.rate if self.bucket else None,
+                "burst": self.bucket.burst if self.bucket else None,
+                "tokens": round(self.bucket.tokens, 2) if self.bucket else None,
+                "admitted": self._admitted,
+                "rejected_concurrency": self._rejected_concurrency,
+                "rejected_rate": self._rejected_rate,
+            }
+
+
+class AdmissionController:
+    def __init__(self, pools: dict[str, dict], endpoint_classes: dict[str, str]):
+        self.pools = {name: AdmissionPool(name, **limits) for name, limits in pools.items()}
+        self.endpoint_classes = dict(endpoint_classes)
+
+    def pool_for(self, endpoint: str | None) -> AdmissionPool | None:
+        name = self.endpoint_classes.get(endpoint or "")
+        return self.pools.get(name) if name else None
+
+    def snapshot(self) -> dict:
+        return {name: pool.snapshot() for name, pool in self.pools.items()}
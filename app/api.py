@@ -1,19 +1,111 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import csv
+import heapq
 import io
+import itertools
+import math
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
 
 import json
 
-from flask import Blueprint, Response, jsonify, request
-from sqlalchemy import func, text
+from flask import Blueprint, Response, current_app, g, jsonify, request
+from sqlalchemy import BigInteger, and_, case, cast, delete, func, insert, or_, text, true, update
 
+from .admission import Rejected
+from .categories import category_condition, session_categories
+from .events import OVERFLOW
 from .extensions import db
-from .models import Item
+from .models import Item, ItemTombstone, SummarySnapshot, format_cents, to_cents
+from .routing import PIN_COOKIE, client_key, get_replica_router
+from .sharding import get_shard_router
+from .singleflight import CoalescedTimeout
+from .snapshots import as_utc, downsample
 
 api_bp = Blueprint("api", __name__)
 
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Read-only endpoints that must still see the primary.
+_PRIMARY_ONLY_ENDPOINTS = frozenset({"api.health"})
+
+
+# Endpoints whose identical concurrent requests share one computation (see report_summary).
+# With coalescing on, only the request that runs the computation is admitted.
+_COALESCED_ENDPOINTS = frozenset({"api.report_summary"})
+
+
+@api_bp.before_request
+def _admit_request():
+    pool = _admission_pool()
+    if pool is None:
+        return None
+    if request.endpoint in _COALESCED_ENDPOINTS and "report_flight" in current_app.extensions:
+        return None
+    try:
+        _admit(pool)
+    except Rejected as exc:
+        return _rejected(exc)
+    return None
+
+
+def _admission_pool():
+    controller = current_app.extensions.get("admission")
+    return controller.pool_for(request.endpoint) if controller is not None else None
+
+
+def _admit(pool) -> None:
+    pool.acquire()
+    g.admission_pool = pool
+
+
+def _rejected(exc: Rejected):
+    body, status = _json_error(exc.reason, status_code=exc.status_code)
+    return body, status, {"Retry-After": str(exc.retry_after)}
+
+
+@api_bp.teardown_request
+def _release_admission(exc):
+    _release_admission_slot()
+
+
+def _release_admission_slot() -> None:
+    pool = g.pop("admission_pool", None)
+    if pool is not None:
+        pool.release()
+
+
+@api_bp.before_request
+def _route_reads_to_replicas():
+    router = get_replica_router()
+    if router is None:
+        return None
+    g.db_read_only = (
+        request.method in _SAFE_METHODS
+        and request.endpoint not in _PRIMARY_ONLY_ENDPOINTS
+        and not router.is_pinned(client_key(), request.cookies.get(PIN_COOKIE))
+    )
+    return None
+
+
+@api_bp.after_request
+def _pin_client_after_write(response):
+    router = get_replica_router()
+    if router is not None and request.method not in _SAFE_METHODS and response.status_code < 400:
+        # Read-your-writes: this client reads from the primary until replicas catch up.
+        router.pin(client_key())
+        if router.pin_seconds > 0:
+            response.set_cookie(
+                PIN_COOKIE,
+                router.pin_token(),
+                max_age=math.ceil(router.pin_seconds),
+                httponly=True,
+                samesite="Lax",
+            )
+    return response
+
 
 def _json_error(message: str, *, status_code: int = 400, details: dict | None = None):
     payload: dict = {"error": message}
@@ -58,10 +150,100 @@ def _as_decimal(value, field: str) -> tuple[Decimal | None, tuple | None]:
             dec = Decimal(str(value))
         except (InvalidOperation, ValueError):
             return None, _json_error(f"Field '{field}' must be a number.", status_code=400)
+        if not dec.is_finite():
+            return None, _json_error(f"Field '{field}' must be a number.", status_code=400)
         return dec, None
     return None, _json_error(f"Field '{field}' must be a number.", status_code=400)
 
 
+# Upper bound of the former NUMERIC(12, 2) price column.
+MAX_PRICE = Decimal("9999999999.99")
+
+
+def _as_price_cents(value) -> tuple[int | None, tuple | None]:
+    price, err = _as_decimal(value, "price")
+    if err:
+        return None, err
+    # Both bounds are checked before quantizing: huge exponents make quantize() raise.
+    if price > MAX_PRICE:
+        return None, _json_error(f"Field 'price' cannot exceed {MAX_PRICE}.", status_code=400)
+    cents = to_cents(price) if price > 0 else 0
+    if cents <= 0:
+        return None, _json_error("Field 'price' must be greater than zero.", status_code=400)
+    return cents, None
+
+
+def _exact_money() -> tuple[bool | None, tuple | None]:
+    """``?money=exact`` renders money as decimal strings instead of floats."""
+    money = (request.args.get("money") or "float").lower()
+    if money not in ("float", "exact"):
+        return None, _json_error("Query parameter 'money' must be 'float' or 'exact'.", status_code=400)
+    return money == "exact", None
+
+
+def _as_datetime(value, field: str) -> tuple[datetime | None, tuple | None]:
+    try:
+        return as_utc(datetime.fromisoformat(value)), None
+    except (TypeError, ValueError):
+        return None, _json_error(f"Parameter '{field}' must be an ISO 8601 datetime.", status_code=400)
+
+
+def _add_item(session, fields: dict) -> Item:
+    category_id = session_categories(session).id_for(session, fields["category"], create=True)
+    # Equal timestamps mark the row as never updated (item.created vs item.updated events).
+    now = datetime.now(timezone.utc)
+    item = Item(**fields, category_id=category_id, created_at=now, updated_at=now)
+    session.add(item)
+    return item
+
+
+def _apply_item_changes(session, item_id: int, changes: dict) -> Item | None:
+    item = session.get(Item, item_id)
+    if item is None:
+        return None
+    if "category" in changes:
+        changes = {
+            **changes,
+            "category_id": session_categories(session).id_for(session, changes["category"], create=True),
+        }
+    for field, value in changes.items():
+        setattr(item, field, value)
+    return item
+
+
+def _submit_grouped(op) -> tuple[Item | None, tuple | None]:
+    """Run a write through the group committer (see app/group_commit.py)."""
+    try:
+        return current_app.extensions["group_commit"].submit(op), None
+    except Exception as exc:
+        return None, _json_error("Write failed.", status_code=503, details={"reason": str(exc)})
+
+
+def _read_partials(fn, *, category: str | None = None) -> list:
+    """
+    Run a read ``fn(session)`` once per shard in parallel, or once on ``db.session``.
+
+    Callers merge the partial results; with category sharding a category filter
+    narrows the fan-out to the owning shard.
+    """
+    shards = get_shard_router()
+    if shards is None:
+        return [fn(db.session)]
+    return shards.scatter(fn, shards.shards_for_category(category))
+
+
+def _select_item_shard(item_id: int) -> bool:
+    """Pin this request to the shard owning ``item_id``; False if no shard owns it."""
+    shards = get_shard_router()
+    if shards is None:
+        return True
+    shard = shards.shard_for_id(item_id)
+    if shard is None:
+        return False
+    g.db_shard = shard
+    return True
+
+
 @api_bp.get("/")
 def root():
     """Информация об API."""
@@ -70,16 +252,25 @@ def root():
         "version": "1.0",
         "endpoints": {
             "health": "/health",
+            "livez": "/livez (процесс жив, без обращения к БД)",
+            "readyz": "/readyz (готовность по фоновой проверке БД)",
+            "metrics": "/metrics",
+            "events": "/events (SSE, ?category=...&low_stock=1)",
             "items": {
                 "POST /items": "Создать товар",
                 "GET /items": "Список товаров (опционально ?category=...)",
+                "GET /items/changes?since=<cursor>": "Изменения и удаления после курсора (delta sync)",
                 "GET /items/<id>": "Получить товар по ID",
                 "PUT /items/<id>": "Обновить товар",
                 "DELETE /items/<id>": "Удалить товар",
+                "PATCH /items?category=...": "Массовое изменение цены/количества (set/add/percent, ?dry_run=1)",
+                "DELETE /items?category=...&quantity_lte=...": "Массовое удаление (?dry_run=1)",
             },
             "reports": {
                 "GET /reports/summary": "Сводный отчёт (JSON)",
                 "GET /reports/summary?format=csv": "Сводный отчёт (CSV)",
+                "GET /reports/timeseries?from=&to=&step=": "История стоимости и количества (по снимкам)",
+                "GET /reports/top?by=value|quantity&n=&category=": "Самые дорогие позиции / ближе всего к нулю",
             },
         },
     }
@@ -100,6 +291,24 @@ def health():
     return jsonify({"status": "ok"})
 
 
+@api_bp.get("/livez")
+def livez():
+    return jsonify({"status": "ok"})
+
+
+@api_bp.get("/readyz")
+def readyz():
+    """Cached heartbeat status; never touches the database itself."""
+    status = current_app.extensions["heartbeat"].status()
+    return jsonify(status), 200 if status["status"] == "ready" else 503
+
+
+@api_bp.get("/metrics")
+def metrics():
+    providers = current_app.extensions.get("metrics", {})
+    return jsonify({name: snapshot() for name, snapshot in providers.items()})
+
+
 @api_bp.post("/items")
 def create_item():
     data, err = _get_json_object()
@@ -124,41 +333,78 @@ def create_item():
     if quantity < 0:
         return _json_error("Field 'quantity' cannot be negative.", status_code=400)
 
-    price, err = _as_decimal(data.get("price"), "price")
+    price_cents, err = _as_price_cents(data.get("price"))
     if err:
         return err
-    if price <= 0:
-        return _json_error("Field 'price' must be greater than zero.", status_code=400)
 
-    item = Item(name=name, quantity=quantity, price=price, category=category)
-    db.session.add(item)
-    db.session.commit()
+    exact, err = _exact_money()
+    if err:
+        return err
 
-    return jsonify(item.to_dict()), 201
+    shards = get_shard_router()
+    if shards is not None:
+        g.db_shard = shards.shard_for_new_item(category)
+
+    fields = {
+        "name": name,
+        "quantity": quantity,
+        "price_cents": price_cents,
+        "category": category,
+    }
+    if "group_commit" in current_app.extensions:
+        item, err = _submit_grouped(lambda session: _add_item(session, fields))
+        if err:
+            return err
+    else:
+        item = _add_item(db.session, fields)
+        if shards is not None:
+            db.session.flush()
+            # Past the end of its id range the row would be routed to the next shard.
+            if shards.shard_for_id(item.id) != g.db_shard:
+                db.session.rollback()
+                return _json_error(
+                    "Shard has run out of item ids.", status_code=503, details={"shard": g.db_shard}
+                )
+        db.session.commit()
+
+    return jsonify(item.to_dict(exact)), 201
 
 
 @api_bp.get("/items")
 def list_items():
     category = request.args.get("category")
+    exact, err = _exact_money()
+    if err:
+        return err
 
-    query = Item.query.order_by(Item.id.asc())
-    if category:
-        query = query.filter(Item.category == category)
+    def fetch(session):
+        query = session.query(Item).order_by(Item.id.asc())
+        if category:
+            query = query.filter(category_condition(session, category))
+        return [i.to_dict(exact) for i in query]
 
-    items = query.all()
-    return jsonify([i.to_dict() for i in items])
+    # k-way merge of the per-shard id-ordered lists.
+    partials = _read_partials(fetch, category=category)
+    return jsonify(list(heapq.merge(*partials, key=lambda i: i["id"])))
 
 
 @api_bp.get("/items/<int:item_id>")
 def get_item(item_id: int):
+    if not _select_item_shard(item_id):
+        return _json_error("Item not found.", status_code=404)
     item = db.session.get(Item, item_id)
     if item is None:
         return _json_error("Item not found.", status_code=404)
-    return jsonify(item.to_dict())
+    exact, err = _exact_money()
+    if err:
+        return err
+    return jsonify(item.to_dict(exact))
 
 
 @api_bp.put("/items/<int:item_id>")
 def update_item(item_id: int):
+    if not _select_item_shard(item_id):
+        return _json_error("Item not found.", status_code=404)
     item = db.session.get(Item, item_id)
     if item is None:
         return _json_error("Item not found.", status_code=404)
@@ -172,17 +418,19 @@ def update_item(item_id: int):
     if unknown:
         return _json_error("Unknown fields in request body.", details={"unknown": unknown})
 
+    changes: dict = {}
+
     if "name" in data:
         name, err = _as_non_empty_str(data.get("name"), "name")
         if err:
             return err
-        item.name = name
+        changes["name"] = name
 
     if "category" in data:
         category, err = _as_non_empty_str(data.get("category"), "category")
         if err:
             return err
-        item.category = category
+        changes["category"] = category
 
     if "quantity" in data:
         quantity, err = _as_int(data.get("quantity"), "quantity")
@@ -190,64 +438,531 @@ def update_item(item_id: int):
             return err
         if quantity < 0:
             return _json_error("Field 'quantity' cannot be negative.", status_code=400)
-        item.quantity = quantity
+        changes["quantity"] = quantity
 
     if "price" in data:
-        price, err = _as_decimal(data.get("price"), "price")
+        price_cents, err = _as_price_cents(data.get("price"))
         if err:
             return err
-        if price <= 0:
-            return _json_error("Field 'price' must be greater than zero.", status_code=400)
-        item.price = price
+        changes["price_cents"] = price_cents
 
-    db.session.commit()
-    return jsonify(item.to_dict())
+    exact, err = _exact_money()
+    if err:
+        return err
+
+    shards = get_shard_router()
+    if shards is not None and "category" in changes and not shards.can_hold(g.db_shard, changes["category"]):
+        return _json_error(
+            "Changing the category would move the item to another shard; recreate it instead.",
+            status_code=409,
+        )
+    if "group_commit" in current_app.extensions:
+        # Release the read transaction before waiting for the shared commit.
+        db.session.rollback()
+        item, err = _submit_grouped(lambda session: _apply_item_changes(session, item_id, changes))
+        if err:
+            return err
+        if item is None:
+            return _json_error("Item not found.", status_code=404)
+    else:
+        item = _apply_item_changes(db.session, item_id, changes)
+        db.session.commit()
+
+    return jsonify(item.to_dict(exact))
 
 
 @api_bp.delete("/items/<int:item_id>")
 def delete_item(item_id: int):
+    if not _select_item_shard(item_id):
+        return _json_error("Item not found.", status_code=404)
     item = db.session.get(Item, item_id)
     if item is None:
         return _json_error("Item not found.", status_code=404)
 
+    db.session.add(ItemTombstone(item_id=item.id, category_id=item.category_id))
     db.session.delete(item)
     db.session.commit()
     return "", 204
 
 
-def _build_summary_payload() -> dict:
-    total_value = db.session.query(func.coalesce(func.sum(Item.quantity * Item.price), 0)).scalar()
-    if total_value is None:
-        total_value = Decimal("0")
+BULK_OPS = ("set", "add", "percent")
+MAX_PRICE_CENTS = to_cents(MAX_PRICE)
+# Upper bound of the INTEGER quantity column.
+MAX_QUANTITY = 2**31 - 1
+
+
+def _write_partials(fn, *, category: str, accept) -> tuple[list, bool]:
+    """
+    Run a write ``fn(session)`` on ``db.session``, or on every shard that can hold ``category``.
+
+    Commits everywhere if ``accept(results)``, otherwise rolls back everywhere; returns
+    ``(results, accepted)``.
+    """
+    shards = get_shard_router()
+    if shards is None:
+        results = [fn(db.session)]
+        accepted = accept(results)
+        if accepted:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        return results, accepted
+    return shards.scatter_write(fn, shards.shards_for_category(category), accept=accept)
+
+
+def _as_percent(value, field: str) -> tuple[Decimal | None, tuple | None]:
+    percent, err = _as_decimal(value, field)
+    if err:
+        return None, err
+    # The bounds are checked first: huge exponents make quantize() raise.
+    if not -100 <= percent <= 10000 or percent != percent.quantize(Decimal("0.01")):
+        return None, _json_error(
+            f"Percent change of '{field}' must be between -100 and 10000 with at most two decimals.",
+            status_code=400,
+        )
+    return percent, None
+
+
+def _parse_bulk_change(field: str, spec) -> tuple[tuple | None, tuple | None]:
+    """``{"<op>": value}`` -> (op, amount); price amounts are in cents."""
+    if not isinstance(spec, dict) or len(spec) != 1 or next(iter(spec)) not in BULK_OPS:
+        return None, _json_error(
+            f"Field '{field}' must be an object with exactly one of: {', '.join(BULK_OPS)}.", status_code=400
+        )
+    op, value = next(iter(spec.items()))
+
+    if op == "percent":
+        amount, err = _as_percent(value, field)
+        if not err and field == "price" and amount == -100:
+            err = _json_error("Field 'price' cannot be reduced by 100%.", status_code=400)
+    elif field == "quantity":
+        amount, err = _as_int(value, field)
+        if not err and op == "set" and amount < 0:
+            err = _json_error("Field 'quantity' cannot be negative.", status_code=400)
+        if not err and abs(amount) > MAX_QUANTITY:
+            err = _json_error(f"Field 'quantity' cannot exceed {MAX_QUANTITY}.", status_code=400)
+    elif op == "set":
+        amount, err = _as_price_cents(value)
+    else:
+        amount, err = _as_decimal(value, field)
+        if not err and abs(amount) > MAX_PRICE:
+            err = _json_error(f"Field 'price' cannot exceed {MAX_PRICE}.", status_code=400)
+        if not err:
+            amount = to_cents(amount)
+    return (None, err) if err else ((op, amount), None)
+
+
+def _bulk_expression(column, op: str, amount, *, low: int, high: int):
+    """SQL expression for the new value of ``column``; add/percent results are clamped to [low, high]."""
+    if op == "set":
+        return amount
+    # BIGINT arithmetic: INTEGER * INTEGER overflows on Postgres before the clamp applies.
+    column = cast(column, BigInteger)
+    if op == "add":
+        expr = column + amount
+    else:
+        # Integer arithmetic, rounded half up: column * (10000 + basis points) / 10000.
+        expr = (column * (10000 + int(amount * 100)) + 5000) // 10000
+    return case((expr < low, low), (expr > high, high), else_=expr)
+
+
+def _bulk_filter() -> tuple[dict | None, tuple | None]:
+    """Filters, dry-run flag and row cap shared by PATCH and DELETE /items."""
+    category = (request.args.get("category") or "").strip()
+    if not category:
+        return None, _json_error("Query parameter 'category' is required for bulk changes.", status_code=400)
+    quantity_lte = None
+    if request.args.get("quantity_lte") is not None:
+        quantity_lte, err = _as_int(request.args["quantity_lte"], "quantity_lte")
+        if err:
+            return None, err
+
+    max_rows = current_app.config["BULK_MAX_ROWS"]
+    if request.args.get("max_rows") is not None:
+        requested, err = _as_int(request.args["max_rows"], "max_rows")
+        if err:
+            return None, err
+        if requested < 1:
+            return None, _json_error("Query parameter 'max_rows' must be positive.", status_code=400)
+        max_rows = min(max_rows, requested)
+
+    return {
+        "category": category,
+        "quantity_lte": quantity_lte,
+        "dry_run": (request.args.get("dry_run") or "").lower() in ("1", "true", "yes"),
+        "max_rows": max_rows,
+    }, None
+
+
+def _bulk_conditions(session, bulk: dict) -> list:
+    # Category ids are per database, so the filter is built for each shard's session.
+    conditions = [category_condition(session, bulk["category"])]
+    if bulk["quantity_lte"] is not None:
+        conditions.append(Item.quantity <= bulk["quantity_lte"])
+    return conditions
+
+
+def _run_bulk(bulk: dict, statement_fn):
+    """
+    Count the matching rows, then run ``statement_fn(session)`` and commit.
+
+    ``statement_fn`` returns ``(result, affected rows)``. With shards the statement runs on
+    each of them without committing; all commit only if the total stays within ``max_rows``
+    (rows may have changed since the count), otherwise all roll back. Returns
+    ``(matched, results, None)`` or ``(None, None, error)``.
+    """
+    def count(session):
+        return session.query(func.count(Item.id)).filter(*_bulk_conditions(session, bulk)).scalar()
+
+    matched = sum(_read_partials(count, category=bulk["category"]))
+    if bulk["dry_run"]:
+        db.session.rollback()
+        return matched, None, None
+    if matched > bulk["max_rows"]:
+        db.session.rollback()
+        return None, None, _json_error(
+            "Too many items match the filter.",
+            status_code=409,
+            details={"matched": matched, "max_rows": bulk["max_rows"]},
+        )
+
+    def within_cap(results):
+        return sum(affected for _, affected in results) <= bulk["max_rows"]
+
+    results, accepted = _write_partials(statement_fn, category=bulk["category"], accept=within_cap)
+    if not accepted:
+        return None, None, _json_error(
+            "Too many items match the filter.",
+            status_code=409,
+            details={"matched": sum(affected for _, affected in results), "max_rows": bulk["max_rows"]},
+        )
+    return matched, [result for result, _ in results], None
+
+
+@api_bp.patch("/items")
+def bulk_update_items():
+    """
+    Set-based update of every item in ``?category=`` (optionally ``&quantity_lte=``).
+
+    Body: ``{"price": {"percent": -10}, "quantity": {"add": 5}}`` with one of ``set``,
+    ``add`` or ``percent`` per field. ``?dry_run=1`` only counts the matching items.
+    """
+    bulk, err = _bulk_filter()
+    if err:
+        return err
+    data, err = _get_json_object()
+    if err:
+        return err
+
+    allowed = {"price", "quantity"}
+    unknown = sorted(k for k in data if k not in allowed)
+    if unknown:
+        return _json_error("Unknown fields in request body.", details={"unknown": unknown})
+    if not data:
+        return _json_error("Request body must change 'price' and/or 'quantity'.", status_code=400)
+
+    values: dict = {}
+    for field in sorted(data):
+        change, err = _parse_bulk_change(field, data[field])
+        if err:
+            return err
+        op, amount = change
+        if field == "price":
+            values["price_cents"] = _bulk_expression(Item.price_cents, op, amount, low=1, high=MAX_PRICE_CENTS)
+        else:
+            values["quantity"] = _bulk_expression(Item.quantity, op, amount, low=0, high=MAX_QUANTITY)
+
+    def statement(session):
+        # Stamped right before the UPDATE, after the count, to keep it close to the commit
+        # (delta sync holds back rows younger than SYNC_SAFETY_LAG_SECONDS).
+        stamped = {**values, "updated_at": datetime.now(timezone.utc)}
+        result = session.execute(
+            update(Item).where(*_bulk_conditions(session, bulk)).values(stamped),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount, result.rowcount
+
+    matched, results, err = _run_bulk(bulk, statement)
+    if err:
+        return err
+    if bulk["dry_run"]:
+        return jsonify({"matched": matched, "dry_run": True})
+
+    return jsonify({"matched": matched, "updated": sum(results)})
+
+
+@api_bp.delete("/items")
+def bulk_delete_items():
+    """Set-based delete of every item in ``?category=`` (optionally ``&quantity_lte=``), with tombstones."""
+    bulk, err = _bulk_filter()
+    if err:
+        return err
+
+    def statement(session):
+        # DELETE ... RETURNING (SQLite 3.35+, PostgreSQL) gives the ids for the tombstones
+        # without a separate SELECT that concurrent inserts could slip past.
+        rows = session.execute(
+            delete(Item).where(*_bulk_conditions(session, bulk)).returning(Item.id, Item.category_id),
+            execution_options={"synchronize_session": False},
+        ).all()
+        if rows:
+            now = datetime.now(timezone.utc)
+            session.execute(
+                insert(ItemTombstone),
+                [{"item_id": r.id, "category_id": r.category_id, "deleted_at": now} for r in rows],
+            )
+        return rows, len(rows)
+
+    matched, results, err = _run_bulk(bulk, statement)
+    if err:
+        return err
+    if bulk["dry_run"]:
+        return jsonify({"matched": matched, "dry_run": True})
+
+    return jsonify({"matched": matched, "deleted": sum(len(rows) for rows in results)})
+
+
+@api_bp.get("/events")
+def events():
+    """
+    Server-Sent Events stream of item changes.
+
+    ``?category=a,b`` limits the stream to those categories, ``?low_stock=1`` adds
+    ``stock.low`` alerts. Reconnecting clients resume after ``Last-Event-ID``. Events are
+    published by each worker's ChangeFeed (app/events.py), not by the handlers that write.
+    """
+    broker = current_app.extensions["events"]
+
+    raw_categories = request.args.get("category")
+    categories = None
+    if raw_categories:
+        categories = frozenset(c.strip() for c in raw_categories.split(",") if c.strip())
+    low_stock = (request.args.get("low_stock") or "").lower() in ("1", "true", "yes")
+
+    last_position = None
+    raw_last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if raw_last_id:
+        # Event ids are delta-sync cursors; an id that is not one makes the client resync.
+        last_position = _decode_cursor(raw_last_id) or (datetime.min.replace(tzinfo=timezone.utc), 0)
+
+    sub, reset_id = broker.subscribe(categories=categories, low_stock=low_stock, last_position=last_position)
+    keepalive = current_app.config["EVENTS_KEEPALIVE_SECONDS"]
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            if reset_id is not None:
+                # Missed events cannot be replayed: the client must resync via /items/changes.
+                # The id moves its Last-Event-ID past them so the next reconnect resumes normally.
+                yield f"id: {reset_id}\nevent: reset\ndata: {{}}\n\n"
+            while True:
+                event = sub.get(keepalive)
+                if event is None:
+                    yield ": keepalive\n\n"
+                elif event is OVERFLOW:
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                else:
+                    yield event.to_sse()
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+SYNC_PAGE_DEFAULT = 500
+SYNC_PAGE_MAX = 5000
+
+
+def _encode_cursor(ts: datetime, item_id: int) -> str:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    raw = f"{ts.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, item_id = raw.split("|")
+        return datetime.fromisoformat(ts).replace(tzinfo=timezone.utc), int(item_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _after_cursor(ts_column, id_column, cursor: tuple[datetime, int] | None):
+    if cursor is None:
+        return true()
+    ts, item_id = cursor
+    return or_(ts_column > ts, and_(ts_column == ts, id_column > item_id))
+
+
+def _changes_after(cursor: tuple[datetime, int] | None, limit: int, *, exact: bool = False) -> tuple[list, bool]:
+    """
+    The first ``limit`` changes after ``cursor``, oldest first, and whether more follow.
+
+    A change is ``(timestamp, item_id, item, deleted)``; for deletions ``item`` only holds
+    the id and category. Changes younger than ``SYNC_SAFETY_LAG_SECONDS`` are left out
+    (see item_changes). Also feeds the SSE broker (app/events.py).
+    """
+    horizon = datetime.now(timezone.utc) - timedelta(seconds=current_app.config["SYNC_SAFETY_LAG_SECONDS"])
+
+    def fetch(session):
+        items = (
+            session.query(Item)
+            .filter(_after_cursor(Item.updated_at, Item.id, cursor), Item.updated_at <= horizon)
+            .order_by(Item.updated_at.asc(), Item.id.asc())
+            .limit(limit + 1)
+            .all()
+        )
+        tombstones = (
+            session.query(ItemTombstone)
+            .filter(
+                _after_cursor(ItemTombstone.deleted_at, ItemTombstone.item_id, cursor),
+                ItemTombstone.deleted_at <= horizon,
+            )
+            .order_by(ItemTombstone.deleted_at.asc(), ItemTombstone.item_id.asc())
+            .limit(limit + 1)
+            .all()
+        )
+        categories = session_categories(session)
+        deleted = [
+            {
+                "id": t.item_id,
+                "category": categories.name_for(session, t.category_id) if t.category_id is not None else None,
+            }
+            for t in tombstones
+        ]
+        return sorted(
+            [(as_utc(i.updated_at), i.id, i.to_dict(exact), False) for i in items]
+            + [(as_utc(t.deleted_at), t.item_id, d, True) for t, d in zip(tombstones, deleted)],
+            key=lambda change: (change[0], change[1]),
+        )
+
+    # Merge the keyset streams (items, tombstones, per shard) and keep the first `limit` changes.
+    merged = list(
+        itertools.islice(
+            heapq.merge(*_read_partials(fetch), key=lambda change: (change[0], change[1])),
+            limit + 1,
+        )
+    )
+    return merged[:limit], len(merged) > limit
+
+
+@api_bp.get("/items/changes")
+def item_changes():
+    """
+    Delta sync: items created/updated and ids deleted after ``since``, oldest first.
+
+    Both sources are read with keyset scans on (timestamp, id) indexes, so a sync costs
+    O(changes). Pass ``next_cursor`` back as ``since`` until ``has_more`` is false.
+
+    Timestamps are taken at flush time, not in commit order: a transaction that commits
+    late could land behind a cursor a client already holds. Changes younger than
+    ``SYNC_SAFETY_LAG_SECONDS`` are therefore held back until every transaction that
+    could still commit with an older timestamp has done so.
+    """
+    since = request.args.get("since")
+    cursor = None
+    if since:
+        cursor = _decode_cursor(since)
+        if cursor is None:
+            return _json_error("Query parameter 'since' is not a valid cursor.", status_code=400)
+
+    limit, err = _as_int(request.args.get("limit", SYNC_PAGE_DEFAULT), "limit")
+    if err:
+        return err
+    if not 1 <= limit <= SYNC_PAGE_MAX:
+        return _json_error(f"Query parameter 'limit' must be between 1 and {SYNC_PAGE_MAX}.", status_code=400)
+    exact, err = _exact_money()
+    if err:
+        return err
 
+    page, has_more = _changes_after(cursor, limit, exact=exact)
+
+    upserted = [item for _, _, item, deleted in page if not deleted]
+    upserted_ids = {i["id"] for i in upserted}
+    # An id may be deleted and then reused by a newer row; the live row wins.
+    deleted = sorted({item_id for _, item_id, _, deleted in page if deleted} - upserted_ids)
+
+    next_cursor = _encode_cursor(page[-1][0], page[-1][1]) if page else since
+    return jsonify(
+        {
+            "upserted": upserted,
+            "deleted": deleted,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
+    )
+
+
+def _summary_partial(session, exact: bool = False) -> dict:
+    # Integer arithmetic in the database: quantity * price_cents summed as BIGINT
+    # (NUMERIC on Postgres), converted to a float or decimal string only at the end.
+    value_cents = func.coalesce(func.sum(Item.quantity * Item.price_cents), 0)
+    total_cents = session.query(value_cents).scalar()
+
+    # Group by the integer key and map ids to names through the cache afterwards.
     category_rows = (
-        db.session.query(
-            Item.category.label("category"),
+        session.query(
+            Item.category_id.label("category_id"),
             func.count(Item.id).label("items_count"),
             func.coalesce(func.sum(Item.quantity), 0).label("total_quantity"),
-            func.coalesce(func.sum(Item.quantity * Item.price), 0).label("total_value"),
+            value_cents.label("total_cents"),
         )
-        .group_by(Item.category)
-        .order_by(Item.category.asc())
+        .group_by(Item.category_id)
         .all()
     )
+    categories = session_categories(session)
+
+    non_positive_items = session.query(Item).filter(Item.quantity <= 0).order_by(Item.id.asc()).all()
+
+    return {
+        "total_cents": int(total_cents or 0),
+        "categories": {
+            categories.name_for(session, r.category_id): (int(r.items_count), int(r.total_quantity), int(r.total_cents))
+            for r in category_rows
+        },
+        "items_with_non_positive_quantity": [i.to_dict(exact) for i in non_positive_items],
+    }
+
+
+def _build_summary_payload(exact: bool = False) -> dict:
+    """Summary report; ``exact`` renders money as decimal strings instead of floats."""
+    partials = _read_partials(lambda session: _summary_partial(session, exact))
+    money = format_cents if exact else (lambda cents: cents / 100)
+
+    # Sum the per-category partial aggregates of every shard.
+    totals: dict[str, list] = {}
+    for partial in partials:
+        for category, (count, quantity, cents) in partial["categories"].items():
+            acc = totals.setdefault(category, [0, 0, 0])
+            acc[0] += count
+            acc[1] += quantity
+            acc[2] += cents
 
     categories = [
         {
-            "category": r.category,
-            "items_count": int(r.items_count),
-            "total_quantity": int(r.total_quantity),
-            "total_value": float(r.total_value),
+            "category": category,
+            "items_count": count,
+            "total_quantity": quantity,
+            "total_value": money(cents),
         }
-        for r in category_rows
+        for category, (count, quantity, cents) in sorted(totals.items())
     ]
 
-    non_positive_items = Item.query.filter(Item.quantity <= 0).order_by(Item.id.asc()).all()
+    non_positive_items = heapq.merge(
+        *(p["items_with_non_positive_quantity"] for p in partials), key=lambda i: i["id"]
+    )
 
     return {
-        "total_value": float(total_value),
+        "total_value": money(sum(p["total_cents"] for p in partials)),
         "categories": categories,
-        "items_with_non_positive_quantity": [i.to_dict() for i in non_positive_items],
+        "items_with_non_positive_quantity": list(non_positive_items),
     }
 
 
@@ -273,11 +988,43 @@ def _summary_to_csv(summary: dict) -> str:
 
 @api_bp.get("/reports/summary")
 def report_summary():
-    summary = _build_summary_payload()
-
     fmt = (request.args.get("format") or "json").lower()
+    exact, err = _exact_money()
+    if err:
+        return err
+
+    def compute():
+        summary = _build_summary_payload(exact)
+        return _summary_to_csv(summary) if fmt == "csv" else summary
+
+    flight = current_app.extensions.get("report_flight")
+    if flight is None:
+        result = compute()
+    else:
+
+        def admitted_compute():
+            # Waiters don't touch the database: only the caller running the computation
+            # takes an admission slot and a rate token.
+            pool = _admission_pool()
+            if pool is not None:
+                _admit(pool)
+            try:
+                return compute()
+            finally:
+                _release_admission_slot()
+
+        # Identical concurrent requests share one computation. Requests pinned to the
+        # primary after a write must not join one that reads from a replica.
+        key = ("summary", fmt, g.get("db_read_only", False), tuple(sorted(request.args.items(multi=True))))
+        try:
+            result = flight.do(key, admitted_compute)
+        except Rejected as exc:
+            return _rejected(exc)
+        except CoalescedTimeout:
+            return _json_error("Report computation timed out.", status_code=504)
+
     if fmt == "csv":
-        csv_text = _summary_to_csv(summary)
+        csv_text = result
         return Response(
             csv_text,
             status=200,
@@ -288,5 +1035,104 @@ def report_summary():
             },
         )
 
-    return jsonify(summary)
+    return jsonify(result)
+
+
+TOP_DEFAULT = 50
+TOP_MAX = 1000
+TOP_ORDERINGS = {
+    # Both orderings match an index exactly (see models.py), so each query is a LIMIT
+    # scan in index order instead of a sort of the table.
+    "value": (Item.value_cents.desc(), Item.id.desc()),
+    "quantity": (Item.quantity.asc(), Item.id.asc()),
+}
+
 
+def _top_items_query(session, by: str, n: int, category: str | None):
+    query = session.query(Item)
+    if category:
+        query = query.filter(category_condition(session, category))
+    return query.order_by(*TOP_ORDERINGS[by]).limit(n)
+
+
+@api_bp.get("/reports/top")
+def report_top():
+    """
+    Highest-value (``by=value``) or lowest-stock (``by=quantity``) items, optionally in one category.
+    """
+    by = (request.args.get("by") or "value").lower()
+    if by not in TOP_ORDERINGS:
+        return _json_error(f"Parameter 'by' must be one of: {', '.join(TOP_ORDERINGS)}.", status_code=400)
+    n, err = _as_int(request.args.get("n", TOP_DEFAULT), "n")
+    if err:
+        return err
+    if not 1 <= n <= TOP_MAX:
+        return _json_error(f"Parameter 'n' must be between 1 and {TOP_MAX}.", status_code=400)
+    exact, err = _exact_money()
+    if err:
+        return err
+    category = request.args.get("category")
+
+    def sort_key(item: Item) -> tuple:
+        return (-item.value_cents, -item.id) if by == "value" else (item.quantity, item.id)
+
+    # Every shard returns its own top n; merge them and keep the first n overall.
+    partials = _read_partials(lambda session: _top_items_query(session, by, n, category).all(), category=category)
+    merged = itertools.islice(heapq.merge(*partials, key=sort_key), n)
+    money = format_cents if exact else (lambda cents: cents / 100)
+    items = [{**i.to_dict(exact), "value": money(i.value_cents)} for i in merged]
+    return jsonify({"by": by, "n": n, "category": category, "items": items})
+
+
+TIMESERIES_DEFAULT_RANGE = timedelta(days=7)
+TIMESERIES_TARGET_POINTS = 500
+TIMESERIES_MAX_POINTS = 5000
+
+
+@api_bp.get("/reports/timeseries")
+def report_timeseries():
+    """
+    Totals over time from stored summary snapshots, averaged into ``step``-second buckets.
+
+    ``from``/``to`` are ISO 8601 datetimes (default: the last 7 days). ``category`` limits
+    the per-category series to one category.
+    """
+    to_ts = datetime.now(timezone.utc)
+    if request.args.get("to"):
+        to_ts, err = _as_datetime(request.args["to"], "to")
+        if err:
+            return err
+    from_ts = to_ts - TIMESERIES_DEFAULT_RANGE
+    if request.args.get("from"):
+        from_ts, err = _as_datetime(request.args["from"], "from")
+        if err:
+            return err
+    if from_ts >= to_ts:
+        return _json_error("Parameter 'from' must be earlier than 'to'.", status_code=400)
+
+    span = (to_ts - from_ts).total_seconds()
+    step = max(60, math.ceil(span / TIMESERIES_TARGET_POINTS))
+    if request.args.get("step"):
+        step, err = _as_int(request.args["step"], "step")
+        if err:
+            return err
+        if step <= 0:
+            return _json_error("Parameter 'step' must be positive.", status_code=400)
+    if span / step > TIMESERIES_MAX_POINTS:
+        return _json_error(f"Too many points requested (max {TIMESERIES_MAX_POINTS}); increase 'step'.")
+
+    query = SummarySnapshot.query.filter(SummarySnapshot.taken_at >= from_ts, SummarySnapshot.taken_at < to_ts)
+    category = request.args.get("category")
+    if category:
+        query = query.filter(or_(SummarySnapshot.category.is_(None), SummarySnapshot.category == category))
+
+    series = downsample(query.order_by(SummarySnapshot.taken_at.asc()), step)
+    return jsonify(
+        {
+            "from": from_ts.isoformat(),
+            "to": to_ts.isoformat(),
+            "step": step,
+            "total": series.pop(None, []),
+            "categories": series,
+        }
+    )
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import contextlib
+import threading
+import weakref
+
+from sqlalchemy import event, false, insert, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import Category, Item
+
+
+class CategoryCache:
+    """
+    In-process ``name <-> id`` map of the ``categories`` table of one database.
+
+    Categories are only ever added, so cached entries never go stale and misses go to the
+    database. Misses are resolved on the caller's session connection, so a request never
+    needs a second pooled connection (the pre-fork server sizes pools at one per thread).
+    A category created inside a transaction is cached only after that transaction
+    commits, so a rolled-back write cannot leave a dangling id behind.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._ids: dict[str, int] = {}
+        self._names: dict[int, str] = {}
+
+    def _remember(self, rows) -> None:
+        with self._lock:
+            for category_id, name in rows:
+                self._ids[name] = category_id
+                self._names[category_id] = name
+
+    def id_for(self, session, name: str, *, create: bool = False) -> int | None:
+        category_id = self._ids.get(name)
+        if category_id is not None:
+            return category_id
+        uncommitted = _uncommitted(session, self)
+        if name in uncommitted:
+            return uncommitted[name]
+
+        conn = _item_connection(session)
+        lookup = select(Category.id).where(Category.name == name)
+        category_id = conn.execute(lookup).scalar()
+        if category_id is not None:
+            self._remember([(category_id, name)])
+        elif create:
+            _insert_if_missing(conn, name)
+            category_id = conn.execute(lookup).scalar()
+            uncommitted[name] = category_id
+        return category_id
+
+    def name_for(self, session, category_id: int) -> str:
+        name = self._names.get(category_id)
+        if name is not None:
+            return name
+        uncommitted = {i: n for n, i in _uncommitted(session, self).items()}
+        if category_id in uncommitted:
+            return uncommitted[category_id]
+        # The dictionary is small: reload all of it instead of one row.
+        rows = _item_connection(session).execute(select(Category.id, Category.name)).all()
+        self._remember(row for row in rows if row.id not in uncommitted)
+        return self._names[category_id]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"cached": len(self._ids)}
+
+
+def _item_connection(session):
+    """The connection ``session`` uses for ``items`` (primary, replica or shard)."""
+    return session.connection(bind_arguments={"mapper": inspect(Item)})
+
+
+def _uncommitted(session, cache: CategoryCache) -> dict[str, int]:
+    """Categories ``session`` created in its current transaction, by cache."""
+    return session.info.setdefault("new_categories", {}).setdefault(cache, {})
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_categories(session) -> None:
+    for cache, created in session.info.pop("new_categories", {}).items():
+        cache._remember((category_id, name) for name, category_id in created.items())
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_categories(session) -> None:
+    session.info.pop("new_categories", None)
+
+
+def _insert_if_missing(conn, name: str) -> None:
+    """Insert a category; concurrent writers may race to create the same name."""
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        module = postgresql if dialect == "postgresql" else sqlite
+        conn.execute(module.insert(Category).values(name=name).on_conflict_do_nothing(index_elements=["name"]))
+        return
+    with contextlib.suppress(IntegrityError), conn.begin_nested():
+        conn.execute(insert(Category).values(name=name))
+
+
+_caches: weakref.WeakKeyDictionary[Engine, CategoryCache] = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def category_cache(engine: Engine) -> CategoryCache:
+    """The cache of one database (primary, replica or shard); ids differ between shards."""
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = CategoryCache(engine)
+        return cache
+
+
+def session_categories(session) -> CategoryCache:
+    """Cache of the database ``session`` reads items from."""
+    return category_cache(session.get_bind(mapper=inspect(Item)))
+
+
+def category_condition(session, name: str):
+    """``WHERE`` clause for items of category ``name`` in the database of ``session``."""
+    category_id = session_categories(session).id_for(session, name)
+    return Item.category_id == category_id if category_id is not None else false()
+
+
+@event.listens_for(Item, "load")
+def _resolve_category_name(item: Item, context) -> None:
+    cache = context.attributes.get("category_cache")
+    if cache is None:
+        cache = context.attributes["category_cache"] = session_categories(context.session)
+    item.category = cache.name_for(context.session, item.category_id)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from flask import Flask
+
+from .extensions import db
+
+# (timestamp, item id): the delta-sync keyset position of a change.
+Position = tuple[datetime, int]
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    position: Position
+    type: str
+    data: dict
+    categories: frozenset[str]
+
+    def to_sse(self) -> str:
+        data = json.dumps(self.data, ensure_ascii=False)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n"
+
+
+# Returned by Subscriber.get() when the subscriber fell too far behind.
+OVERFLOW = object()
+
+
+class Subscriber:
+    def __init__(
+        self,
+        *,
+        categories: frozenset[str] | None,
+        low_stock: bool,
+        max_buffer: int,
+        after: Position | None = None,
+    ):
+        self.categories = categories
+        self.low_stock = low_stock
+        self.max_buffer = max_buffer
+        # Position the client already has (it may come from a worker whose feed is ahead of ours).
+        self.after = after
+        self.overflowed = False
+        self._events: deque[Event] = deque()
+        self._cond = threading.Condition()
+
+    def wants(self, event: Event) -> bool:
+        if self.after is not None and event.position <= self.after:
+            return False
+        if event.type == "stock.low" and not self.low_stock:
+            return False
+        return self.categories is None or bool(self.categories & event.categories)
+
+    def offer(self, event: Event) -> None:
+        if not self.wants(event):
+            return
+        with self._cond:
+            if self.overflowed:
+                return
+            if len(self._events) >= self.max_buffer:
+                # Drop the backlog instead of growing it; the client resumes with Last-Event-ID.
+                self.overflowed = True
+                self._events.clear()
+            else:
+                self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout: float):
+        """Next event, OVERFLOW after falling behind, or None if nothing arrived in time."""
+        with self._cond:
+            if not self._events and not self.overflowed:
+                self._cond.wait(timeout)
+            if self.overflowed:
+                return OVERFLOW
+            return self._events.popleft() if self._events else None
+
+
+class EventBroker:
+    """
+    In-process fan-out of item change events to SSE subscribers.
+
+    Events are published by a ChangeFeed in position order. The last ``history_size``
+    events are kept so reconnecting clients can resume after ``Last-Event-ID``. Each
+    subscriber buffers at most ``max_buffer`` undelivered events; a subscriber that falls
+    further behind is disconnected.
+    """
+
+    def __init__(self, *, history_size: int, max_buffer: int, low_stock_threshold: int):
+        self.max_buffer = max_buffer
+        self.low_stock_threshold = low_stock_threshold
+
+        self._lock = threading.Lock()
+        self._history: deque[Event] = deque(maxlen=history_size)
+        # Changes at or before the floor are not in the history (evicted, or before the feed started).
+        self._floor: Position | None = None
+        self._last_id: str | None = None
+        self._subscribers: set[Subscriber] = set()
+        self._disconnected_slow = 0
+
+    def start_at(self, position: Position, event_id: str) -> None:
+        with self._lock:
+            self._history.clear()
+            self._floor = position
+            self._last_id = event_id
+
+    def publish(self, position: Position, event_id: str, event_type: str, data: dict, categories) -> None:
+        event = Event(event_id, position, event_type, data, frozenset(c for c in categories if c))
+        with self._lock:
+            if len(self._history) == self._history.maxlen:
+                self._floor = self._history[0].position
+            self._history.append(event)
+            self._last_id = event_id
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.offer(event)
+
+    def publish_change(self, position: Position, event_id: str, item: dict, *, deleted: bool) -> None:
+        """Events for one delta-sync change; ``item`` holds only id and category for deletions."""
+        if deleted:
+            action = "deleted"
+        else:
+            action = "created" if item["created_at"] == item["updated_at"] else "updated"
+        self.publish(position, event_id, f"item.{action}", {"action": action, "item": item}, (item["category"],))
+
+        if not deleted and item["quantity"] < self.low_stock_threshold:
+            alert = {
+                "item_id": item["id"],
+                "name": item["name"],
+                "category": item["category"],
+                "quantity": item["quantity"],
+                "threshold": self.low_stock_threshold,
+            }
+            self.publish(position, event_id, "stock.low", alert, (item["category"],))
+
+    def subscribe(
+        self, *, categories: frozenset[str] | None, low_stock: bool, last_position: Position | None
+    ) -> tuple[Subscriber, str | None]:
+        """
+        Register a subscriber and queue the events it missed.
+
+        Returns the subscriber and, when the missed events cannot be replayed (no longer
+        in history, or more than fit into the subscriber's buffer), the id of the newest
+        event: the client has to resync (e.g. via ``/items/changes``) and then resume
+        from that id.
+        """
+        sub = Subscriber(categories=categories, low_stock=low_stock, max_buffer=self.max_buffer, after=last_position)
+        with self._lock:
+            reset_id = None
+            if last_position is not None:
+                missed = [e for e in self._history if sub.wants(e)]
+                if self._floor is None or last_position < self._floor or len(missed) > self.max_buffer:
+                    # Replaying would overflow the buffer and the client would reconnect
+                    # with the same Last-Event-ID forever.
+                    reset_id = self._last_id
+                    sub.after = None
+                else:
+                    for event in missed:
+                        sub.offer(event)
+            self._subscribers.add(sub)
+        return sub, reset_id
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+            if sub.overflowed:
+                self._disconnected_slow += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "last_event_id": self._last_id,
+                "history": len(self._history),
+                "disconnected_slow_consumers": self._disconnected_slow,
+            }
+
+
+class ChangeFeed:
+    """
+    Background thread that publishes committed changes to an EventBroker.
+
+    It polls ``fetch(position, limit)``, the keyset scan over items and tombstones behind
+    ``/items/changes``, every ``interval`` seconds. Changes come from the database rather
+    than from the request that wrote them, so every worker process publishes every write,
+    in the same order and under the same ids: the delta-sync cursor (``encode``) of the
+    change. Like delta sync, the scan holds back changes younger than the safety lag.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        broker: EventBroker,
+        fetch: Callable[[Position | None, int], tuple[list, bool]],
+        *,
+        encode: Callable[[datetime, int], str],
+        interval: float,
+        lag: float,
+        page_size: int,
+    ):
+        self.app = app
+        self.broker = broker
+        self.fetch = fetch
+        self.encode = encode
+        self.interval = interval
+        self.lag = lag
+        self.page_size = page_size
+        self.position: Position | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.rewind()
+
+    def rewind(self) -> None:
+        """Start from the changes that are just becoming visible, forgetting the history."""
+        self.position = (datetime.now(timezone.utc) - timedelta(seconds=self.lag), 0)
+        self.broker.start_at(self.position, self.encode(*self.position))
+
+    def poll(self) -> int:
+        """Publish every change after the current position; returns the number of changes."""
+        published = 0
+        with self.app.app_context():
+            try:
+                while True:
+                    changes, has_more = self.fetch(self.position, self.page_size)
+                    for ts, item_id, item, deleted in changes:
+                        self.position = (ts, item_id)
+                        self.broker.publish_change(self.position, self.encode(ts, item_id), item, deleted=deleted)
+                    published += len(changes)
+                    if not has_more:
+                        return published
+            finally:
+                db.session.remove()
+
+    def start(self) -> None:
+        # A worker forked from the preloading master must not replay everything since the fork.
+        self.rewind()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="event-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                self.app.logger.exception("Event feed poll failed")
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+WriteOp = Callable[[Session], Any]
+
+
+@dataclass
+class _Pending:
+    op: WriteOp
+    submitted: float = field(default_factory=time.monotonic)
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+@dataclass
+class _Batch:
+    ops: list[_Pending] = field(default_factory=list)
+    full: threading.Event = field(default_factory=threading.Event)
+
+
+class GroupCommitter:
+    """
+    Batches concurrent single-row writes into one transaction.
+
+    The first caller of a batch becomes its leader: it waits up to ``window_seconds`` (or
+    until ``max_batch`` operations have joined), applies every operation in one session and
+    commits once. Every caller gets its result only after that shared commit. If the shared
+    commit fails, the operations are retried one by one so a single bad write does not fail
+    the whole batch.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], *, window_seconds: float, max_batch: int):
+        self.session_factory = session_factory
+        self.window_seconds = window_seconds
+        self.max_batch = max(1, max_batch)
+
+        self._lock = threading.Lock()
+        self._open: _Batch | None = None
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._operations = 0
+        self._failed_batches = 0
+        self._batch_sizes: dict[int, int] = {}
+        self._added_latency_total = 0.0
+        self._added_latency_max = 0.0
+
+    def submit(self, op: WriteOp) -> Any:
+        pending = _Pending(op)
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.ops.append(pending)
+            if len(batch.ops) >= self.max_batch:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window_seconds)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._flush(batch.ops)
+        else:
+            pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _commit(self, ops: list[_Pending]) -> None:
+        session = self.session_factory()
+        try:
+            results = [p.op(session) for p in ops]
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        for p, result in zip(ops, results):
+            p.result = result
+
+    def _flush(self, ops: list[_Pending]) -> None:
+        failed = False
+        try:
+            self._commit(ops)
+        except Exception as exc:
+            failed = True
+            if len(ops) == 1:
+                ops[0].error = exc
+            else:
+                for p in ops:
+                    try:
+                        self._commit([p])
+                    except Exception as op_exc:
+                        p.error = op_exc
+        finally:
+            self._record(ops, failed)
+            for p in ops:
+                p.done.set()
+
+    def _record(self, ops: list[_Pending], failed: bool) -> None:
+        now = time.monotonic()
+        added = [now - p.submitted for p in ops]
+        with self._stats_lock:
+            self._batches += 1
+            self._operations += len(ops)
+            self._failed_batches += int(failed)
+            self._batch_sizes[len(ops)] = self._batch_sizes.get(len(ops), 0) + 1
+            self._added_latency_total += sum(added)
+            self._added_latency_max = max(self._added_latency_max, *added)
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window_seconds * 1000,
+                "max_batch": self.max_batch,
+                "batches": self._batches,
+                "operations": self._operations,
+                "failed_batches": self._failed_batches,
+                "avg_batch_size": self._operations / self._batches if self._batches else 0.0,
+                "batch_sizes": {str(k): v for k, v in sorted(self._batch_sizes.items())},
+                "avg_added_latency_ms": (
+                    self._added_latency_total / self._operations * 1000 if self._operations else 0.0
+                ),
+                "max_added_latency_ms": self._added_latency_max * 1000,
+            }
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+
+def pool_status(engine: Engine) -> dict:
+    """Checked-out connections of an engine's pool relative to its capacity."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"checked_out": None, "capacity": None, "saturation": None}
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    }
+
+
+class DatabaseHeartbeat:
+    """
+    Background ``SELECT 1`` against every database the app needs, cached for ``/readyz``.
+
+    ``targets`` maps a name to an engine (the primary and any shards). Each target is
+    probed through its own single-connection engine, so the heartbeat neither waits for
+    nor takes connections from the application pools. A target counts as down when its
+    last probe failed or when it had no successful probe for ``stale_after`` seconds,
+    which also covers a probe that hangs. ``on_beat`` runs after every round (used to
+    refresh replica health).
+    """
+
+    def __init__(
+        self,
+        targets: dict[str, Engine],
+        *,
+        interval: float,
+        stale_after: float,
+        on_beat: Callable[[], None] | None = None,
+    ):
+        self.targets = dict(targets)
+        self.interval = interval
+        self.stale_after = stale_after
+        self.on_beat = on_beat
+
+        self._lock = threading.Lock()
+        self._probes: dict[str, Engine] = {}
+        self._state: dict[str, dict] = {}
+        self._stop = threading.Event()
+
+    def _probe_engine(self, name: str, engine: Engine) -> Engine:
+        probe = self._probes.get(name)
+        if probe is None:
+            probe = self._probes[name] = create_engine(engine.url, poolclass=StaticPool)
+        return probe
+
+    def _probe(self, name: str, engine: Engine) -> None:
+        started = time.monotonic()
+        try:
+            with self._probe_engine(name, engine).connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception as exc:
+            with self._lock:
+                state = self._state.setdefault(name, {"ok_at": None})
+                state.update(error=type(exc).__name__, latency=None)
+            return
+        finished = time.monotonic()
+        with self._lock:
+            self._state[name] = {"ok_at": finished, "error": None, "latency": finished - started}
+
+    def beat(self) -> None:
+        for name, engine in self.targets.items():
+            self._probe(name, engine)
+        if self.on_beat is not None:
+            self.on_beat()
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        targets = self.targets
+        with self._lock:
+            states = {name: dict(self._state.get(name, {})) for name in targets}
+
+        databases = {}
+        for name, engine in targets.items():
+            state = states[name]
+            ok_at = state.get("ok_at")
+            latency = state.get("latency")
+            databases[name] = {
+                "ready": not state.get("error") and ok_at is not None and now - ok_at <= self.stale_after,
+                "last_success_age_seconds": round(now - ok_at, 3) if ok_at is not None else None,
+                "heartbeat_latency_ms": round(latency * 1000, 3) if latency is not None else None,
+                "error": state.get("error"),
+                "pool": pool_status(engine),
+            }
+
+        if all(target["ready"] for target in databases.values()):
+            status = "ready"
+        elif not any(states.values()):
+            status = "starting"
+        else:
+            status = "unavailable"
+        return {"status": status, "databases": databases}
+
+    def start(self) -> None:
+        self._stop.clear()
+        threading.Thread(target=self._loop, name="db-heartbeat", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while True:
+            self.beat()
+            if self._stop.wait(self.interval):
+                return
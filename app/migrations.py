@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from .extensions import db
+
+
+def _migrate_price_to_cents(engine: Engine) -> None:
+    """Replace the old ``items.price`` NUMERIC(12, 2) column by integer ``price_cents``."""
+    inspector = inspect(engine)
+    if not inspector.has_table("items"):
+        return
+    columns = {c["name"] for c in inspector.get_columns("items")}
+    if "price" not in columns:
+        return
+    with engine.begin() as conn:
+        if "price_cents" not in columns:
+            conn.execute(text("ALTER TABLE items ADD COLUMN price_cents BIGINT"))
+        conn.execute(text("UPDATE items SET price_cents = CAST(ROUND(price * 100) AS BIGINT)"))
+        # SQLite (3.35+) can drop the column but cannot add NOT NULL afterwards.
+        conn.execute(text("ALTER TABLE items DROP COLUMN price"))
+        if engine.dialect.name != "sqlite":
+            conn.execute(text("ALTER TABLE items ALTER COLUMN price_cents SET NOT NULL"))
+
+
+def _migrate_category_to_dictionary(engine: Engine) -> None:
+    """Replace the free-text ``items.category`` column by ``category_id`` -> ``categories``."""
+    inspector = inspect(engine)
+    if not inspector.has_table("items"):
+        return
+    columns = {c["name"] for c in inspector.get_columns("items")}
+    if "category" not in columns:
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO categories (name) SELECT DISTINCT category FROM items "
+                "WHERE category NOT IN (SELECT name FROM categories)"
+            )
+        )
+        if "category_id" not in columns:
+            conn.execute(text("ALTER TABLE items ADD COLUMN category_id INTEGER REFERENCES categories (id)"))
+        conn.execute(
+            text("UPDATE items SET category_id = (SELECT id FROM categories WHERE categories.name = items.category)")
+        )
+        # SQLite refuses to drop an indexed column.
+        conn.execute(text("DROP INDEX IF EXISTS ix_items_category"))
+        conn.execute(text("ALTER TABLE items DROP COLUMN category"))
+        if engine.dialect.name != "sqlite":
+            conn.execute(text("ALTER TABLE items ALTER COLUMN category_id SET NOT NULL"))
+
+
+def _add_tombstone_category(engine: Engine) -> None:
+    """Add the nullable ``item_tombstones.category_id`` column."""
+    inspector = inspect(engine)
+    if not inspector.has_table("item_tombstones"):
+        return
+    if "category_id" in {c["name"] for c in inspector.get_columns("item_tombstones")}:
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE item_tombstones ADD COLUMN category_id INTEGER"))
+
+
+# Indexes superseded by wider ones in the models.
+REPLACED_INDEXES = ("ix_items_category_id",)
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """
+    Bring an existing database up to date with the models.
+
+    ``db.create_all()`` only creates missing tables, so columns and indexes changed on
+    existing tables later have to be migrated here. Every step is idempotent and safe to
+    run at each start.
+    """
+    _migrate_price_to_cents(engine)
+    _migrate_category_to_dictionary(engine)
+    _add_tombstone_category(engine)
+    with engine.begin() as conn:
+        for name in REPLACED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        # IF NOT EXISTS rather than checkfirst: SQLite reflection skips expression indexes.
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
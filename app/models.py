@@ -1,22 +1,52 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 
-from sqlalchemy import DateTime, Integer, Numeric, String
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, Numeric, String, cast
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .extensions import db
 
 
+def to_cents(value) -> int:
+    """Money amount (Decimal, int or numeric string) to integer cents, rounding half up."""
+    return int((Decimal(value) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def format_cents(cents: int) -> str:
+    """Exact decimal string for an amount in cents: 12345 -> '123.45'."""
+    return str(Decimal(cents).scaleb(-2))
+
+
+class Category(db.Model):
+    """Category dictionary; items reference it by id. Rows are never renamed or deleted."""
+
+    __tablename__ = "categories"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+
+
 class Item(db.Model):
     __tablename__ = "items"
+    __table_args__ = (
+        # Keyset index for delta sync (GET /items/changes): id breaks updated_at ties.
+        Index("ix_items_updated_at_id", "updated_at", "id"),
+        # Category filters and the lowest-stock-per-category report (/reports/top?by=quantity).
+        Index("ix_items_category_id_quantity_id", "category_id", "quantity", "id"),
+        # Never reuse ids on SQLite: deleted ids live on in tombstones, and shards seed
+        # their id ranges through sqlite_sequence.
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
-    price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
-    category: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    # Money is stored as integer cents: sums stay exact and need no Decimal round trips.
+    price_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    category_id: Mapped[int] = mapped_column(Integer, ForeignKey("categories.id"), nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -30,14 +60,89 @@ class Item(db.Model):
         nullable=False,
     )
 
-    def to_dict(self) -> dict:
+    # Category name, resolved through the in-process cache when the row is loaded
+    # (see app/categories.py). Writers set it together with category_id.
+    _category_name = None
+
+    @property
+    def category(self) -> str | None:
+        return self._category_name
+
+    @category.setter
+    def category(self, name: str) -> None:
+        self._category_name = name
+
+    @hybrid_property
+    def price(self) -> Decimal:
+        return Decimal(self.price_cents).scaleb(-2)
+
+    @price.inplace.setter
+    def _price_setter(self, value) -> None:
+        self.price_cents = to_cents(value)
+
+    @price.inplace.expression
+    @classmethod
+    def _price_expression(cls):
+        return cast(cls.price_cents, Numeric(14, 2)) / 100
+
+    @hybrid_property
+    def value_cents(self) -> int:
+        """Stock value; the same expression backs the ix_items_*value_id indexes."""
+        return self.quantity * self.price_cents
+
+    def to_dict(self, exact_money: bool = False) -> dict:
+        """``exact_money`` renders the price as a decimal string instead of a float."""
         return {
             "id": self.id,
             "name": self.name,
             "quantity": self.quantity,
-            "price": float(self.price),
+            "price": format_cents(self.price_cents) if exact_money else self.price_cents / 100,
             "category": self.category,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
 
+
+# Expression indexes for /reports/top?by=value, read backwards in index order instead of sorting.
+Index("ix_items_value_id", Item.value_cents, Item.id)
+Index("ix_items_category_id_value_id", Item.category_id, Item.value_cents, Item.id)
+# Lowest stock over all categories; also serves the non-positive quantity scan of the summary.
+Index("ix_items_quantity_id", Item.quantity, Item.id)
+
+
+class ItemTombstone(db.Model):
+    """Record of a deleted item, so delta-sync clients learn about deletions."""
+
+    __tablename__ = "item_tombstones"
+    __table_args__ = (Index("ix_item_tombstones_deleted_at_item_id", "deleted_at", "item_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    item_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Lets category-filtered /events subscribers see the deletion; NULL for older tombstones.
+    category_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class SummarySnapshot(db.Model):
+    """
+    One point of the inventory time series (see app/snapshots.py).
+
+    ``category`` is NULL for the whole-inventory totals. ``resolution`` is the number of
+    seconds the point covers: raw snapshots have the snapshot interval, rolled-up points
+    hold averages over a coarser bucket that starts at ``taken_at``.
+    """
+
+    __tablename__ = "summary_snapshots"
+    __table_args__ = (Index("ix_summary_snapshots_taken_at_resolution", "taken_at", "resolution"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    taken_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    resolution: Mapped[int] = mapped_column(Integer, nullable=False)
+    category: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    items_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_quantity: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total_value: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import Blueprint, Flask, abort, current_app, g, jsonify, request, send_from_directory
+
+PROFILE_FORMATS = {"pstats": ".prof", "collapsed": ".collapsed"}
+CAPTURE_HEADER = "X-Profile-Token"
+FORMAT_HEADER = "X-Profile-Format"
+# <UTC timestamp>_<method>_<endpoint>_<duration>ms_<random>.<ext>
+_CAPTURE_NAME = re.compile(
+    r"^(?P<ts>\d{8}T\d{6}\d{3}Z)_(?P<method>[A-Z]+)_(?P<endpoint>[\w.-]+)_(?P<ms>\d+)ms_[0-9a-f]+\.(?P<ext>prof|collapsed)$"
+)
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every ``interval`` seconds from a helper thread.
+
+    Produces Brendan Gregg's collapsed format (``root;caller;callee count`` per line),
+    which flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    Profiles selected requests and keeps the captures in ``directory``.
+
+    A request is profiled when it carries ``X-Profile-Token`` equal to ``token`` or, for
+    endpoints in ``endpoints`` (all when empty), with probability ``sample_rate``. Captures
+    older than ``retention_seconds`` and the oldest beyond ``max_files`` / ``max_bytes``
+    are deleted after each write. Hooks are only installed when profiling is enabled.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        token: str | None,
+        sample_rate: float,
+        endpoints: list[str],
+        fmt: str,
+        interval: float,
+        max_files: int,
+        max_bytes: int,
+        retention_seconds: int,
+    ):
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format {fmt!r}, expected one of {tuple(PROFILE_FORMATS)}.")
+        self.directory = directory
+        self.token = token
+        self.sample_rate = sample_rate
+        self.endpoints = frozenset(endpoints)
+        self.format = fmt
+        self.interval = interval
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+
+        self._lock = threading.Lock()
+        self._captured = 0
+        self._skipped_busy = 0
+
+    # --- selection --------------------------------------------------------------------
+
+    def has_token(self) -> bool:
+        supplied = request.headers.get(CAPTURE_HEADER)
+        return bool(self.token and supplied and secrets.compare_digest(supplied, self.token))
+
+    def _sampled(self) -> bool:
+        if self.sample_rate <= 0 or (self.endpoints and request.endpoint not in self.endpoints):
+            return False
+        return secrets.randbelow(1_000_000) < self.sample_rate * 1_000_000
+
+    # --- request hooks ----------------------------------------------------------------
+
+    def start_request(self) -> None:
+        if request.endpoint is None or request.blueprint == "profiling":
+            return
+        requested = self.has_token()
+        if not (requested or self._sampled()):
+            return
+        fmt = request.headers.get(FORMAT_HEADER) if requested else None
+        fmt = fmt if fmt in PROFILE_FORMATS else self.format
+
+        if fmt == "pstats":
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active cProfile per process; skip this request.
+                with self._lock:
+                    self._skipped_busy += 1
+                return
+        else:
+            profile = StackSampler(threading.get_ident(), self.interval)
+            profile.start()
+        g.profile = (fmt, profile, time.perf_counter())
+
+    def finish_request(self, exc) -> None:
+        capture = g.pop("profile", None)
+        if capture is None:
+            return
+        fmt, profile, started = capture
+        if fmt == "pstats":
+            profile.disable()
+        else:
+            profile.stop()
+        duration_ms = int((time.perf_counter() - started) * 1000)
+
+        now = datetime.now(timezone.utc)
+        endpoint = re.sub(r"[^\w.-]", "-", request.endpoint)
+        name = (
+            f"{now:%Y%m%dT%H%M%S}{now.microsecond // 1000:03d}Z_{request.method}_{endpoint}"
+            f"_{duration_ms}ms_{secrets.token_hex(4)}{PROFILE_FORMATS[fmt]}"
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        if fmt == "pstats":
+            profile.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(profile.collapsed())
+        with self._lock:
+            self._captured += 1
+            self._enforce_limits()
+
+    # --- storage ----------------------------------------------------------------------
+
+    def _files(self) -> list[tuple[os.DirEntry, re.Match, os.stat_result]]:
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for entry in os.scandir(self.directory):
+            match = _CAPTURE_NAME.match(entry.name)
+            if match is not None and entry.is_file():
+                files.append((entry, match, entry.stat()))
+        # Names start with a UTC timestamp, so they sort oldest first.
+        return sorted(files, key=lambda f: f[0].name)
+
+    def captures(self) -> list[dict]:
+        """Captures on disk (from every worker), newest first."""
+        return [
+            {
+                "name": entry.name,
+                "format": "pstats" if match["ext"] == "prof" else "collapsed",
+                "method": match["method"],
+                "endpoint": match["endpoint"],
+                "duration_ms": int(match["ms"]),
+                "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                "size": stat.st_size,
+            }
+            for entry, match, stat in reversed(self._files())
+        ]
+
+    def _enforce_limits(self) -> None:
+        files = self._files()
+        cutoff = time.time() - self.retention_seconds
+        total = sum(stat.st_size for _, _, stat in files)
+        for index, (entry, _, stat) in enumerate(files):
+            over_limit = len(files) - index > self.max_files or total > self.max_bytes
+            if not over_limit and stat.st_mtime >= cutoff:
+                break
+            # Another worker may have pruned it first.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(entry.path)
+            total -= stat.st_size
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "format": self.format,
+                "sample_rate": self.sample_rate,
+                "captured": self._captured,
+                "skipped_busy": self._skipped_busy,
+            }
+
+
+profiling_bp = Blueprint("profiling", __name__, url_prefix="/debug/profiles")
+
+
+def _require_token(profiler: RequestProfiler) -> None:
+    if not profiler.token:
+        abort(403, description="Set PROFILING_TOKEN to access captures.")
+    if not profiler.has_token():
+        abort(403)
+
+
+@profiling_bp.get("")
+def list_profiles():
+    profiler = current_app.extensions["profiler"]
+    _require_token(profiler)
+    return jsonify({"directory": profiler.directory, "captures": profiler.captures()})
+
+
+@profiling_bp.get("/<name>")
+def download_profile(name: str):
+    profiler = current_app.extensions["profiler"]
+    _require_token(profiler)
+    if _CAPTURE_NAME.match(name) is None:
+        abort(404)
+    return send_from_directory(profiler.directory, name, as_attachment=True)
+
+
+def init_profiling(app: Flask, profiler: RequestProfiler) -> None:
+    app.extensions["profiler"] = profiler
+    app.extensions["metrics"]["profiling"] = profiler.snapshot
+    app.before_request(profiler.start_request)
+    app.teardown_request(profiler.finish_request)
+    app.register_blueprint(profiling_bp)
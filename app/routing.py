@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+from flask import Flask, current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, TimestampSigner
+from sqlalchemy import create_engine, event, make_url, text
+from sqlalchemy.engine import Engine
+
+# Cookie carrying a signed "read from the primary" pin, so it holds across server processes.
+PIN_COOKIE = "db_pin"
+
+
+def make_extra_engine(app: Flask, uri: str) -> Engine:
+    """
+    Create an engine for an extra database (replica, shard) with the app's engine options.
+
+    These engines are kept out of ``SQLALCHEMY_BINDS`` on purpose: binds register
+    metadata on the shared ``db`` object, which would leak into every other app.
+    Relative SQLite paths are resolved against the instance folder, like the primary URI.
+    """
+    url = make_url(uri)
+    if url.drivername.startswith("sqlite") and url.database and url.database != ":memory:":
+        if not os.path.isabs(url.database):
+            os.makedirs(app.instance_path, exist_ok=True)
+            url = url.set(database=os.path.join(app.instance_path, url.database))
+    return create_engine(url, **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+
+
+class ReplicaRouter:
+    """
+    Chooses a healthy read replica and remembers clients that must read from the primary.
+
+    Replicas are named ``replica_<n>`` in metrics. A replica is probed
+    with ``SELECT 1`` at most once per ``health_interval`` seconds and is skipped while the
+    last probe (or the last query on it) failed. When no replica is healthy, reads fall back
+    to the primary.
+
+    Pins live in this process and, for clients that keep cookies, in a cookie signed with
+    ``secret_key``: the pre-fork server runs several processes, and the client's next read
+    may land on a different one than its write.
+    """
+
+    def __init__(
+        self, engines: dict[str, Engine], *, pin_seconds: float, health_interval: float, secret_key: str
+    ):
+        self.engines = dict(engines)
+        self.bind_keys = list(self.engines)
+        self.pin_seconds = pin_seconds
+        self.health_interval = health_interval
+        self._signer = TimestampSigner(secret_key, salt="read-your-writes")
+
+        self._lock = threading.Lock()
+        self._healthy: dict[str, bool] = {key: True for key in self.bind_keys}
+        self._checked_at: dict[str, float] = {key: 0.0 for key in self.bind_keys}
+        self._pinned_until: dict[str, float] = {}
+        self._next = 0
+
+    # --- read-your-writes -------------------------------------------------------------
+
+    def pin(self, client_key: str | None) -> None:
+        if self.pin_seconds <= 0 or client_key is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pinned_until[client_key] = now + self.pin_seconds
+            if len(self._pinned_until) > 10_000:
+                self._pinned_until = {k: v for k, v in self._pinned_until.items() if v > now}
+
+    def is_pinned(self, client_key: str | None, token: str | None = None) -> bool:
+        with self._lock:
+            until = self._pinned_until.get(client_key) if client_key is not None else None
+        if until is not None and until > time.monotonic():
+            return True
+        if not token:
+            return False
+        try:
+            # Timestamps in the signature are wall-clock seconds, shared by all processes.
+            self._signer.unsign(token, max_age=self.pin_seconds)
+        except BadSignature:
+            return False
+        return True
+
+    def pin_token(self) -> str:
+        return self._signer.sign(b"primary").decode()
+
+    # --- health -----------------------------------------------------------------------
+
+    def mark(self, bind_key: str, healthy: bool) -> None:
+        with self._lock:
+            self._healthy[bind_key] = healthy
+            self._checked_at[bind_key] = time.monotonic()
+
+    def check(self, bind_key: str, engine: Engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            self.mark(bind_key, False)
+            return False
+        self.mark(bind_key, True)
+        return True
+
+    def check_all(self) -> None:
+        for key in self.bind_keys:
+            self.check(key, self.engines[key])
+
+    def pick(self) -> Engine | None:
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k in self.bind_keys if now - self._checked_at[k] >= self.health_interval]
+            # Claim the probes so concurrent requests don't all ping the same replica.
+            for key in stale:
+                self._checked_at[key] = now
+        for key in stale:
+            self.check(key, self.engines[key])
+
+        with self._lock:
+            healthy = [k for k in self.bind_keys if self._healthy[k]]
+            if not healthy:
+                return None
+            key = healthy[self._next % len(healthy)]
+            self._next += 1
+        return self.engines[key]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "replicas": {key: {"healthy": self._healthy[key]} for key in self.bind_keys},
+                "pinned_clients": sum(1 for v in self._pinned_until.values() if v > time.monotonic()),
+            }
+
+    def watch(self) -> None:
+        """Mark a replica unhealthy as soon as a query on it hits a connection error."""
+        for bind_key, engine in self.engines.items():
+
+            def _on_error(context, bind_key=bind_key) -> None:
+                if context.is_disconnect or context.connection is None:
+                    self.mark(bind_key, False)
+
+            event.listen(engine, "handle_error", _on_error)
+
+
+def get_replica_router() -> ReplicaRouter | None:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("replica_router")
+
+
+def client_key() -> str | None:
+    """
+    Identify the caller for in-process read-your-writes pinning.
+
+    Only an explicit ``X-Client-Id`` counts: behind a reverse proxy every client shares
+    one remote address, and one write would pin them all. Other clients rely on the
+    ``db_pin`` cookie.
+    """
+    return request.headers.get("X-Client-Id") or None
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads of read-only requests to a replica.
+
+    Anything flushed by the ORM, as well as every statement outside a request marked
+    read-only (``g.db_read_only``), goes to the primary engine. Requests that selected
+    a shard (``g.db_shard``) use that shard for everything.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_request_context():
+            return engine
+        if engine is not self._db.engines.get(None):
+            return engine
+
+        # Single-row item requests are pinned to the owning shard (see app/sharding.py).
+        shard = g.get("db_shard")
+        if shard is not None:
+            return current_app.extensions["shard_router"].engines[shard]
+
+        if self._flushing or not g.get("db_read_only", False):
+            return engine
+
+        router = get_replica_router()
+        if router is None:
+            return engine
+        # Stick to one replica for the whole request so all reads see the same snapshot.
+        if "db_replica" not in g:
+            g.db_replica = router.pick()
+        return g.db_replica if g.db_replica is not None else engine
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+from flask import Flask
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from .extensions import db
+
+# Connections kept free for migrations, psql sessions and monitoring.
+RESERVED_CONNECTIONS = 5
+# PostgreSQL's default max_connections, used when it cannot be queried.
+DEFAULT_MAX_CONNECTIONS = 100
+MAX_THREADS = 8
+
+
+@dataclass(frozen=True)
+class Capacity:
+    workers: int
+    threads: int
+    pool_size: int
+    max_overflow: int
+
+    @property
+    def connections(self) -> int:
+        """Database connections all workers may hold: the pool plus the heartbeat probe."""
+        return self.workers * (self.pool_size + self.max_overflow + 1)
+
+
+def plan_capacity(cpu_count: int, max_connections: int | None, *, reserved: int = RESERVED_CONNECTIONS) -> Capacity:
+    """
+    Size the pre-fork server from the CPU count and the database connection limit.
+
+    Starts from ``2 * cpu + 1`` workers with ``MAX_THREADS`` threads each, one pooled
+    connection per thread (no overflow, so a busy worker queues on its own pool instead of
+    exhausting the server), then trims threads and workers until every worker's pool plus
+    its heartbeat connection fits into ``max_connections - reserved``.
+    """
+    workers = 2 * max(1, cpu_count) + 1
+    threads = MAX_THREADS
+    if max_connections is not None:
+        budget = max(2, max_connections - reserved)
+        while workers * (threads + 1) > budget and threads > 2:
+            threads -= 1
+        while workers * (threads + 1) > budget and workers > 1:
+            workers -= 1
+        threads = max(1, min(threads, budget // workers - 1))
+    return Capacity(workers=workers, threads=threads, pool_size=threads, max_overflow=0)
+
+
+def detect_max_connections(database_url: str) -> int | None:
+    """``max_connections`` of a PostgreSQL server; None for databases without a limit (SQLite)."""
+    url = make_url(database_url)
+    if not url.drivername.startswith("postgresql"):
+        return None
+    engine = create_engine(url, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            return int(conn.execute(text("SHOW max_connections")).scalar())
+    except Exception:
+        return DEFAULT_MAX_CONNECTIONS
+    finally:
+        engine.dispose()
+
+
+def app_engines(app: Flask) -> list[Engine]:
+    """Every engine the app opened: primary (and binds), replicas and shards."""
+    with app.app_context():
+        engines = list(db.engines.values())
+    replicas = app.extensions.get("replica_router")
+    if replicas is not None:
+        engines.extend(replicas.engines.values())
+    shards = app.extensions.get("shard_router")
+    if shards is not None:
+        engines.extend(shards.engines)
+    return engines
+
+
+class FileLeaderLock:
+    """
+    Non-blocking ``flock`` on a file: exactly one process on the host holds it at a time.
+
+    The holder keeps the lock until it exits; the other workers keep retrying, so the
+    role moves on when the holder is recycled.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+
+    def __call__(self) -> bool:
+        if self._fd is not None:
+            return True
+        import fcntl  # POSIX only, like the pre-fork server itself.
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+
+def start_worker(app: Flask) -> None:
+    """
+    Make a freshly forked worker safe to serve requests.
+
+    Pooled connections inherited from the preloading master are dropped without closing
+    them (``close=False``), since the master's sockets must not be shut down from a child.
+    Background threads (heartbeat, event feed, snapshotter) do not survive ``fork()``, so
+    they are started here. The snapshotter runs in every worker but only the holder of the
+    leader lock takes snapshots.
+    """
+    for engine in app_engines(app):
+        engine.dispose(close=False)
+
+    app.extensions["heartbeat"].start()
+    app.extensions["event_feed"].start()
+    if app.config["SNAPSHOT_INTERVAL_SECONDS"] > 0:
+        snapshotter = app.extensions["snapshotter"]
+        lock_path = app.config["SNAPSHOT_LEADER_LOCK"] or os.path.join(app.instance_path, "snapshotter.lock")
+        snapshotter.leader = FileLeaderLock(lock_path)
+        snapshotter.start()
+
+
+def stop_worker(app: Flask) -> None:
+    app.extensions["heartbeat"].stop()
+    app.extensions["event_feed"].stop()
+    app.extensions["snapshotter"].stop()
+    for engine in app_engines(app):
+        engine.dispose()
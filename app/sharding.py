@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+from flask import current_app, has_app_context
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .migrations import upgrade_schema
+
+SHARD_STRATEGIES = ("category", "id_range")
+
+
+class ShardRouter:
+    """
+    Places ``items`` rows on several databases and fans read queries out to all of them.
+
+    Every shard owns a contiguous id range (``id_span`` ids per shard), so the owner of an
+    existing row is always derived from its id. New rows are placed by a stable hash of
+    their category (``strategy="category"``, keeps a category on one shard) or round-robin
+    (``strategy="id_range"``).
+    """
+
+    def __init__(self, engines: list[Engine], *, strategy: str, id_span: int, request_threads: int = 8):
+        if strategy not in SHARD_STRATEGIES:
+            raise ValueError(f"Unknown shard strategy {strategy!r}, expected one of {SHARD_STRATEGIES}.")
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.id_span = id_span
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+        # The calling thread queries one shard itself; the pool covers the others for
+        # every request thread at once, so concurrent requests do not queue behind each other.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, request_threads * (len(self.engines) - 1)), thread_name_prefix="shard"
+        )
+
+    # --- placement --------------------------------------------------------------------
+
+    def shard_for_id(self, item_id: int) -> int | None:
+        index = (item_id - 1) // self.id_span
+        return index if 0 <= index < len(self.engines) else None
+
+    def shard_for_category(self, category: str) -> int:
+        return zlib.crc32(category.encode("utf-8")) % len(self.engines)
+
+    def shard_for_new_item(self, category: str) -> int:
+        if self.strategy == "category":
+            return self.shard_for_category(category)
+        with self._lock:
+            return next(self._round_robin) % len(self.engines)
+
+    def can_hold(self, shard: int, category: str) -> bool:
+        """Whether a row on ``shard`` may carry ``category`` (rows never move between shards)."""
+        return self.strategy != "category" or self.shard_for_category(category) == shard
+
+    def shards_for_category(self, category: str | None) -> list[int]:
+        if category and self.strategy == "category":
+            return [self.shard_for_category(category)]
+        return list(range(len(self.engines)))
+
+    # --- scatter-gather ---------------------------------------------------------------
+
+    def scatter(self, fn: Callable[[Session], Any], shards: list[int] | None = None) -> list:
+        """Run ``fn(session)`` on the given shards (default: all) in parallel."""
+        shards = list(range(len(self.engines))) if shards is None else shards
+        if not shards:
+            return []
+        first, *rest = shards
+        futures = [self._executor.submit(self._run, self.engines[i], fn) for i in rest]
+        return [self._run(self.engines[first], fn), *(f.result() for f in futures)]
+
+    @staticmethod
+    def _run(engine: Engine, fn: Callable[[Session], Any]) -> Any:
+        with Session(engine) as session:
+            return fn(session)
+
+    def scatter_write(
+        self, fn: Callable[[Session], Any], shards: list[int], *, accept: Callable[[list], bool]
+    ) -> tuple[list, bool]:
+        """
+        Run ``fn(session)`` on the given shards in parallel, each in an open transaction.
+
+        When every shard has finished, all of them commit if ``accept(results)``, otherwise
+        all roll back; returns ``(results, accepted)``. An error on any shard rolls back all
+        of them. Without two-phase commit a failure during the commits themselves can still
+        leave the earlier shards committed.
+        """
+        sessions = [Session(self.engines[i]) for i in shards]
+        try:
+            first, *rest = sessions
+            futures = [self._executor.submit(fn, session) for session in rest]
+            try:
+                results = [fn(first)]
+            finally:
+                wait(futures)
+            results.extend(f.result() for f in futures)
+            accepted = accept(results)
+            for session in sessions:
+                if accepted:
+                    session.commit()
+                else:
+                    session.rollback()
+            return results, accepted
+        finally:
+            for session in sessions:
+                session.close()
+
+    # --- schema -----------------------------------------------------------------------
+
+    def prepare(self) -> None:
+        """Create the schema on every shard and move its id sequence into its range."""
+        for index, engine in enumerate(self.engines):
+            db.metadata.create_all(engine)
+            upgrade_schema(engine)
+            self._seed_id_range(engine, index * self.id_span)
+
+    @staticmethod
+    def _seed_id_range(engine: Engine, floor: int) -> None:
+        if floor == 0:
+            return
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'items'")).scalar()
+                if "AUTOINCREMENT" not in (ddl or "").upper():
+                    raise RuntimeError("SQLite shard table 'items' must be created with AUTOINCREMENT.")
+                updated = conn.execute(
+                    text("UPDATE sqlite_sequence SET seq = :floor WHERE name = 'items' AND seq < :floor"),
+                    {"floor": floor},
+                ).rowcount
+                exists = conn.execute(text("SELECT 1 FROM sqlite_sequence WHERE name = 'items'")).scalar()
+                if not updated and not exists:
+                    conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('items', :floor)"), {"floor": floor})
+            elif engine.dialect.name == "postgresql":
+                conn.execute(
+                    text(
+                        "SELECT setval(pg_get_serial_sequence('items', 'id'), "
+                        "GREATEST(:floor, COALESCE((SELECT MAX(id) FROM items), 0)))"
+                    ),
+                    {"floor": floor},
+                )
+            else:
+                raise NotImplementedError(f"Id ranges are not supported for {engine.dialect.name}.")
+
+    def snapshot(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "shards": len(self.engines),
+            "id_span": self.id_span,
+        }
+
+
+def get_shard_router() -> ShardRouter | None:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("shard_router")
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+
+class CoalescedTimeout(Exception):
+    """The shared computation did not finish within the waiter's timeout."""
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in flight wait for
+    it (up to ``timeout`` seconds) and receive the same result or exception. Nothing is
+    cached once the call completes.
+    """
+
+    def __init__(self, *, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._executions = 0
+        self._coalesced = 0
+        self._timeouts = 0
+        self._errors = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` or wait for the in-flight call with the same ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                self._coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as exc:
+                call.error = exc
+                with self._lock:
+                    self._errors += 1
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise CoalescedTimeout(f"Shared computation did not finish within {self.timeout}s.")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "timeouts": self._timeouts,
+                "errors": self._errors,
+            }
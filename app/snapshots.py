@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable
+
+from flask import Flask
+
+from .extensions import db
+from .models import SummarySnapshot
+
+# (bucket seconds, roll up points older than this many seconds)
+DEFAULT_ROLLUPS = [(3600, 7 * 86400), (86400, 90 * 86400)]
+
+
+def as_utc(ts: datetime) -> datetime:
+    """SQLite hands back naive datetimes; everything stored here is UTC."""
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def floor_time(ts: datetime, step: int) -> datetime:
+    epoch = int(as_utc(ts).timestamp())
+    return datetime.fromtimestamp(epoch - epoch % step, timezone.utc)
+
+
+def take_snapshot(session, summary: dict, *, resolution: int, now: datetime | None = None) -> None:
+    """Persist one point for the whole inventory plus one per category."""
+    now = now or datetime.now(timezone.utc)
+    categories = summary["categories"]
+    session.add(
+        SummarySnapshot(
+            taken_at=now,
+            resolution=resolution,
+            category=None,
+            items_count=sum(c["items_count"] for c in categories),
+            total_quantity=sum(c["total_quantity"] for c in categories),
+            total_value=Decimal(str(summary["total_value"])),
+        )
+    )
+    session.add_all(
+        SummarySnapshot(
+            taken_at=now,
+            resolution=resolution,
+            category=c["category"],
+            items_count=c["items_count"],
+            total_quantity=c["total_quantity"],
+            total_value=Decimal(str(c["total_value"])),
+        )
+        for c in categories
+    )
+
+
+def _weighted_average(points: list[SummarySnapshot]) -> tuple[int, int, Decimal]:
+    weight = sum(p.resolution for p in points)
+    items = sum(p.items_count * p.resolution for p in points) / weight
+    quantity = sum(p.total_quantity * p.resolution for p in points) / weight
+    value = sum(Decimal(p.total_value) * p.resolution for p in points) / weight
+    return round(items), round(quantity), value.quantize(Decimal("0.01"))
+
+
+def roll_up(session, *, step: int, older_than: int, now: datetime) -> int:
+    """
+    Replace finer points older than ``older_than`` seconds by ``step``-second averages.
+
+    Only complete buckets are rolled up. Returns the number of points replaced.
+    """
+    cutoff = floor_time(now - timedelta(seconds=older_than), step)
+    query = session.query(SummarySnapshot).filter(
+        SummarySnapshot.resolution < step, SummarySnapshot.taken_at < cutoff
+    )
+    points = query.all()
+    if not points:
+        return 0
+
+    buckets: dict[tuple, list[SummarySnapshot]] = defaultdict(list)
+    for p in points:
+        buckets[(floor_time(p.taken_at, step), p.category)].append(p)
+
+    query.delete(synchronize_session=False)
+    for (bucket, category), bucket_points in buckets.items():
+        items, quantity, value = _weighted_average(bucket_points)
+        session.add(
+            SummarySnapshot(
+                taken_at=bucket,
+                resolution=step,
+                category=category,
+                items_count=items,
+                total_quantity=quantity,
+                total_value=value,
+            )
+        )
+    return len(points)
+
+
+def apply_retention(session, *, rollups, retention_seconds: int, now: datetime) -> None:
+    for step, older_than in sorted(rollups):
+        roll_up(session, step=step, older_than=older_than, now=now)
+    if retention_seconds > 0:
+        cutoff = now - timedelta(seconds=retention_seconds)
+        session.query(SummarySnapshot).filter(SummarySnapshot.taken_at < cutoff).delete(
+            synchronize_session=False
+        )
+
+
+def downsample(points, step: int) -> dict:
+    """Average points into ``step``-second buckets; returns {category or None: [point, ...]}."""
+    buckets: dict[str | None, dict[datetime, list]] = defaultdict(lambda: defaultdict(list))
+    for p in points:
+        buckets[p.category][floor_time(p.taken_at, step)].append(p)
+
+    series = {}
+    for category, by_time in buckets.items():
+        series[category] = []
+        for bucket in sorted(by_time):
+            items, quantity, value = _weighted_average(by_time[bucket])
+            series[category].append(
+                {
+                    "t": bucket.isoformat(),
+                    "items_count": items,
+                    "total_quantity": quantity,
+                    "total_value": float(value),
+                }
+            )
+    return series
+
+
+class Snapshotter:
+    """Background thread that snapshots the summary every ``interval`` seconds."""
+
+    def __init__(
+        self,
+        app: Flask,
+        summary_fn: Callable[[], dict],
+        *,
+        interval: float,
+        rollups,
+        retention_seconds: int,
+    ):
+        self.app = app
+        self.summary_fn = summary_fn
+        self.interval = interval
+        self.rollups = rollups
+        self.retention_seconds = retention_seconds
+        # With several worker processes only the one for which this returns True snapshots.
+        self.leader: Callable[[], bool] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        with self.app.app_context():
+            try:
+                take_snapshot(db.session, self.summary_fn(), resolution=max(1, int(self.interval)), now=now)
+                apply_retention(
+                    db.session, rollups=self.rollups, retention_seconds=self.retention_seconds, now=now
+                )
+                db.session.commit()
+            finally:
+                db.session.remove()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="summary-snapshotter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                if self.leader is None or self.leader():
+                    self.run_once()
+            except Exception:
+                self.app.logger.exception("Summary snapshot failed")
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,157 @@
+"""
+Бенчмарк справочника категорий: строка в каждой строке items (как было) vs. целый category_id.
+
+Сравниваются размер индекса по категории и таблицы (SQLite, dbstat) и время запроса
+сводного отчёта по категориям (GROUP BY строки vs. GROUP BY id + имена из справочника).
+
+Запуск из корня проекта:
+    python benchmarks/bench_categories.py                  # 1M строк, 200 категорий
+    python benchmarks/bench_categories.py --rows 100000 --categories 50
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import (
+    BigInteger,
+    ForeignKey,
+    Integer,
+    String,
+    create_engine,
+    func,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LegacyItem(Base):
+    __tablename__ = 'legacy_items'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(200))
+    quantity: Mapped[int] = mapped_column(Integer)
+    price_cents: Mapped[int] = mapped_column(BigInteger)
+    category: Mapped[str] = mapped_column(String(100), index=True)
+
+
+class Category(Base):
+    __tablename__ = 'categories'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), unique=True)
+
+
+class NormalizedItem(Base):
+    __tablename__ = 'normalized_items'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(200))
+    quantity: Mapped[int] = mapped_column(Integer)
+    price_cents: Mapped[int] = mapped_column(BigInteger)
+    category_id: Mapped[int] = mapped_column(ForeignKey('categories.id'), index=True)
+
+
+def seed(engine, rows: int, categories: int) -> None:
+    names = [f'Категория товаров склада №{n:03d}' for n in range(categories)]
+    rnd = random.Random(38)  # nosec B311 - синтетические данные
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{'id': n + 1, 'name': name} for n, name in enumerate(names)])
+        legacy, normalized = [], []
+        for i in range(1, rows + 1):
+            c = rnd.randrange(categories)
+            row = {'name': f'Товар {i}', 'quantity': rnd.randint(0, 500), 'price_cents': rnd.randint(1, 100_000)}
+            legacy.append({**row, 'category': names[c]})
+            normalized.append({**row, 'category_id': c + 1})
+            if len(legacy) == 20_000 or i == rows:
+                conn.execute(insert(LegacyItem), legacy)
+                conn.execute(insert(NormalizedItem), normalized)
+                legacy, normalized = [], []
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+
+
+def object_size(engine, name: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text('SELECT SUM(pgsize) FROM dbstat WHERE name = :name'), {'name': name}).scalar()
+
+
+def summary_legacy(session):
+    rows = session.execute(
+        select(
+            LegacyItem.category,
+            func.count(LegacyItem.id),
+            func.sum(LegacyItem.quantity),
+            func.sum(LegacyItem.quantity * LegacyItem.price_cents),
+        ).group_by(LegacyItem.category)
+    ).all()
+    return {r[0]: r[1:] for r in rows}
+
+
+def summary_normalized(session, names: dict):
+    rows = session.execute(
+        select(
+            NormalizedItem.category_id,
+            func.count(NormalizedItem.id),
+            func.sum(NormalizedItem.quantity),
+            func.sum(NormalizedItem.quantity * NormalizedItem.price_cents),
+        ).group_by(NormalizedItem.category_id)
+    ).all()
+    return {names[r[0]]: r[1:] for r in rows}
+
+
+def timed(engine, fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            result = fn(session)
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--categories', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'categories.db')}")
+        Base.metadata.create_all(engine)
+        seed(engine, args.rows, args.categories)
+
+        sizes = {
+            'индекс': (object_size(engine, 'ix_legacy_items_category'),
+                       object_size(engine, 'ix_normalized_items_category_id')),
+            'таблица': (object_size(engine, 'legacy_items'), object_size(engine, 'normalized_items')),
+        }
+        with Session(engine) as session:
+            # Имена категорий — как в кеше приложения: загружены один раз.
+            names = dict(session.execute(select(Category.id, Category.name)).all())
+        legacy_time, legacy_result = timed(engine, summary_legacy, args.repeat)
+        normalized_time, normalized_result = timed(
+            engine, lambda session: summary_normalized(session, names), args.repeat
+        )
+        assert legacy_result == normalized_result  # nosec B101 - проверка бенчмарка
+        engine.dispose()
+
+    mb = 1024 * 1024
+    print(f'{args.rows} строк, {args.categories} категорий, лучшее из {args.repeat}')
+    print(f"{'':16} {'строка':>10} {'category_id':>12}")
+    for label, (legacy, normalized) in sizes.items():
+        print(f"{label + ', МБ':16} {legacy / mb:10.1f} {normalized / mb:12.1f}")
+    print(f"{'summary, с':16} {legacy_time:10.3f} {normalized_time:12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Бенчмарк хранения цены: NUMERIC(12, 2) + Decimal (как было) vs. целые центы (как сейчас).
+
+Сравниваются запрос сводного отчёта (суммы по категориям) и выгрузка списка товаров
+в словари (как в to_dict) на SQLite; дополнительно печатается погрешность total_value.
+
+Запуск из корня проекта:
+    python benchmarks/bench_money.py               # 200k строк
+    python benchmarks/bench_money.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Integer, Numeric, String, create_engine, func, insert, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LegacyItem(Base):
+    __tablename__ = 'legacy_items'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(200))
+    quantity: Mapped[int] = mapped_column(Integer)
+    price: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    category: Mapped[str] = mapped_column(String(100), index=True)
+
+
+class CentsItem(Base):
+    __tablename__ = 'cents_items'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(200))
+    quantity: Mapped[int] = mapped_column(Integer)
+    price_cents: Mapped[int] = mapped_column(BigInteger)
+    category: Mapped[str] = mapped_column(String(100), index=True)
+
+
+def seed(engine, n: int) -> Decimal:
+    """Заполняет обе таблицы одинаковыми данными; возвращает точную общую стоимость."""
+    rnd = random.Random(12)  # nosec B311 - синтетические данные
+    exact = 0
+    batch_legacy, batch_cents = [], []
+    with engine.begin() as conn:
+        for i in range(1, n + 1):
+            cents = rnd.randint(1, 10_000_000)
+            quantity = rnd.randint(0, 500)
+            exact += cents * quantity
+            row = {'name': f'Товар {i}', 'quantity': quantity, 'category': f'cat{i % 50}'}
+            batch_legacy.append({**row, 'price': Decimal(cents).scaleb(-2)})
+            batch_cents.append({**row, 'price_cents': cents})
+            if len(batch_cents) == 10_000 or i == n:
+                conn.execute(insert(LegacyItem), batch_legacy)
+                conn.execute(insert(CentsItem), batch_cents)
+                batch_legacy, batch_cents = [], []
+    return Decimal(exact).scaleb(-2)
+
+
+def summary_legacy(session):
+    rows = session.execute(
+        select(
+            LegacyItem.category,
+            func.count(LegacyItem.id),
+            func.sum(LegacyItem.quantity),
+            func.sum(LegacyItem.quantity * LegacyItem.price),
+        ).group_by(LegacyItem.category)
+    ).all()
+    total = sum((Decimal(str(r[3])) for r in rows), Decimal('0'))
+    return float(total)
+
+
+def summary_cents(session):
+    rows = session.execute(
+        select(
+            CentsItem.category,
+            func.count(CentsItem.id),
+            func.sum(CentsItem.quantity),
+            func.sum(CentsItem.quantity * CentsItem.price_cents),
+        ).group_by(CentsItem.category)
+    ).all()
+    return Decimal(sum(int(r[3]) for r in rows)).scaleb(-2)
+
+
+def list_legacy(session):
+    return [
+        {'id': i.id, 'name': i.name, 'quantity': i.quantity, 'price': float(i.price), 'category': i.category}
+        for i in session.scalars(select(LegacyItem))
+    ]
+
+
+def list_cents(session):
+    return [
+        {'id': i.id, 'name': i.name, 'quantity': i.quantity, 'price': i.price_cents / 100, 'category': i.category}
+        for i in session.scalars(select(CentsItem))
+    ]
+
+
+def timed(engine, fn, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            result = fn(session)
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'money.db')}")
+        Base.metadata.create_all(engine)
+        exact = seed(engine, args.rows)
+
+        legacy_summary, legacy_total = timed(engine, summary_legacy, args.repeat)
+        cents_summary, cents_total = timed(engine, summary_cents, args.repeat)
+        legacy_list, _ = timed(engine, list_legacy, args.repeat)
+        cents_list, _ = timed(engine, list_cents, args.repeat)
+        engine.dispose()
+
+    print(f'{args.rows} строк, лучшее из {args.repeat}')
+    print(f"{'':12} {'NUMERIC':>10} {'центы':>10}")
+    print(f"{'summary, с':12} {legacy_summary:10.3f} {cents_summary:10.3f}")
+    print(f"{'list, с':12} {legacy_list:10.3f} {cents_list:10.3f}")
+    print(f'total_value: точно {exact}, NUMERIC {legacy_total!r}, центы {cents_total}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Бенчмарк таблиц инвентаря в docx: потоковый XML-писатель vs. python-docx по ячейкам.
+
+Запуск из корня проекта:
+    python benchmarks/bench_report_tables.py                 # 10k и 100k строк
+    python benchmarks/bench_report_tables.py --rows 10000 --python-docx-max-rows 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from generate_report import add_placeholder, iter_table_xml, write_docx_streaming  # noqa: E402
+
+COLUMNS = ['ID', 'Название', 'Количество', 'Цена']
+
+
+def synthetic_rows(n: int):
+    for i in range(1, n + 1):
+        yield i, f'Товар {i}', i % 500, f'{(i % 10000) / 100 + 1:.2f}'
+
+
+def bench_streaming(n: int, path: str) -> float:
+    started = time.perf_counter()
+    doc = Document()
+    add_placeholder(doc, 'items')
+    write_docx_streaming(doc, path, {'items': lambda: iter_table_xml(COLUMNS, synthetic_rows(n))})
+    return time.perf_counter() - started
+
+
+def bench_python_docx(n: int, path: str) -> float:
+    started = time.perf_counter()
+    doc = Document()
+    table = doc.add_table(rows=1, cols=len(COLUMNS))
+    for cell, title in zip(table.rows[0].cells, COLUMNS):
+        cell.text = title
+    for row in synthetic_rows(n):
+        cells = table.add_row().cells
+        for cell, value in zip(cells, row):
+            cell.text = str(value)
+    doc.save(path)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--python-docx-max-rows', type=int, default=10_000,
+                        help='python-docx медленный: не запускать его на таблицах больше этого размера')
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'writer':>12} {'seconds':>8} {'file MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            runs = [('streaming', bench_streaming)]
+            if n <= args.python_docx_max_rows:
+                runs.append(('python-docx', bench_python_docx))
+            for name, fn in runs:
+                path = os.path.join(tmp, f'{name}-{n}.docx')
+                elapsed = fn(n, path)
+                size = os.path.getsize(path)
+                print(f'{n:>8} {name:>12} {elapsed:>8.2f} {size / 2**20:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
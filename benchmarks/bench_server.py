@@ -0,0 +1,135 @@
+"""
+Бенчмарк пропускной способности: встроенный dev-сервер Flask vs. gunicorn (gunicorn.conf.py).
+
+Каждый сервер запускается отдельным процессом на одной и той же SQLite-базе (или на
+DATABASE_URL из окружения), затем N клиентских потоков в течение заданного времени
+запрашивают GET /items/<id> и GET /reports/top?n=10 по постоянным соединениям.
+
+Запуск из корня проекта (Linux/macOS, нужен gunicorn):
+    python benchmarks/bench_server.py
+    python benchmarks/bench_server.py --clients 64 --seconds 20
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess  # nosec B404 - запуск тестируемых серверов
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ITEMS = 1000
+
+
+def wait_ready(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/livez')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Сервер на порту {port} не запустился')
+
+
+def seed(port: int) -> None:
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    for i in range(ITEMS):
+        body = json.dumps({'name': f'Товар {i}', 'quantity': i % 50, 'price': 10 + i % 90, 'category': f'cat{i % 10}'})
+        conn.request('POST', '/items', body, {'Content-Type': 'application/json'})
+        conn.getresponse().read()
+
+
+def load(port: int, clients: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(seed_value: int) -> None:
+        rnd = random.Random(seed_value)  # nosec B311 - выбор запросов для нагрузки
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        own, failed = [], 0
+        while time.monotonic() < deadline:
+            path = f'/items/{rnd.randint(1, ITEMS)}' if rnd.random() < 0.8 else '/reports/top?n=10'
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            own.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / seconds,
+        'p50': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        'errors': errors[0],
+    }
+
+
+def run_server(name: str, port: int, env: dict, clients: int, seconds: float, seed_db: bool) -> dict:
+    if name == 'flask':
+        cmd = [sys.executable, '-m', 'flask', '--app', 'wsgi', 'run', '--port', str(port)]
+    else:
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py']
+        env = {**env, 'BIND': f'127.0.0.1:{port}'}
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # nosec B603
+    try:
+        wait_ready(port)
+        if seed_db:
+            seed(port)
+        load(port, clients, 2)  # прогрев
+        return load(port, clients, seconds)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            'DATABASE_URL': os.environ.get('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'bench.db')}"),
+            # Бенчмарк измеряет сервер, а не ограничение нагрузки.
+            'ADMISSION_CONTROL_ENABLED': '0',
+        }
+        results = {
+            'flask run': run_server('flask', 8301, env, args.clients, args.seconds, seed_db=True),
+            'gunicorn': run_server('gunicorn', 8302, env, args.clients, args.seconds, seed_db=False),
+        }
+
+    print(f'{args.clients} клиентов, {args.seconds:.0f} с, CPU: {os.cpu_count()}')
+    print(f"{'':10} {'req/s':>8} {'p50, мс':>8} {'p99, мс':>8} {'ошибки':>7}")
+    for name, r in results.items():
+        print(f"{name:10} {r['rps']:8.0f} {r['p50']:8.1f} {r['p99']:8.1f} {r['errors']:7d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,19 @@
 """
 Скрипт для генерации docx отчёта по РГЗ (вариант 12).
+
+Запуск:
+    python generate_report.py                      # только текст отчёта
+    python generate_report.py --inventory          # + данные инвентаря из DATABASE_URL
+    python generate_report.py --database-url URL   # + данные инвентаря из указанной БД
 """
+import argparse
+import io
+import re
+import shutil
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
 from docx import Document
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
@@ -181,7 +194,215 @@ def read_source_file(filepath: str) -> str:
         return f"# Ошибка чтения файла {filepath}: {e}"
 
 
-def main():
+# --- Данные инвентаря: потоковая запись больших таблиц -------------------------------
+#
+# python-docx создаёт объект на каждую ячейку и держит весь документ в памяти, поэтому
+# таблицы на сотни тысяч строк в нём строятся минутами. Здесь документ сначала собирается
+# python-docx с абзацами-заглушками, а затем word/document.xml переписывается в архив
+# потоково: на месте заглушки пишется XML таблиц пачками строк.
+
+INVENTORY_PLACEHOLDER = '@@INVENTORY:{}@@'
+PLACEHOLDER_RE = re.compile(r'<w:p\b(?:(?!<w:p\b).)*?@@INVENTORY:([\w-]+)@@.*?</w:p>', re.DOTALL)
+TABLE_ROWS_PER_CHUNK = 1000
+
+_CELL_OPEN = (
+    '<w:tc><w:p><w:pPr><w:spacing w:before="0" w:after="0" w:line="240" w:lineRule="auto"/>'
+    '<w:ind w:firstLine="0"/></w:pPr><w:r><w:rPr><w:sz w:val="20"/></w:rPr><w:t xml:space="preserve">'
+)
+_HEADER_CELL_OPEN = _CELL_OPEN.replace('<w:rPr>', '<w:rPr><w:b/>')
+_CELL_CLOSE = '</w:t></w:r></w:p></w:tc>'
+# Символы, недопустимые в XML 1.0 (управляющие и т. п.): escape() их не убирает,
+# а API принимает их в названиях товаров.
+_XML_ILLEGAL_RE = re.compile('[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]')
+
+
+def xml_text(value) -> str:
+    """Значение для текста w:t: экранированное и без символов, недопустимых в XML."""
+    return escape(_XML_ILLEGAL_RE.sub('', str(value)))
+
+
+def add_placeholder(doc: Document, key: str):
+    """Абзац-заглушка, на место которого write_docx_streaming запишет содержимое секции."""
+    return doc.add_paragraph(INVENTORY_PLACEHOLDER.format(key))
+
+
+def paragraph_xml(text: str, bold: bool = False, size_pt: int = 14) -> str:
+    """XML абзаца без отступа первой строки (для заголовков внутри потоковых секций)."""
+    rpr = f'<w:rPr>{"<w:b/>" if bold else ""}<w:sz w:val="{size_pt * 2}"/></w:rPr>'
+    return (
+        '<w:p><w:pPr><w:spacing w:before="240" w:after="120"/><w:ind w:firstLine="0"/></w:pPr>'
+        f'<w:r>{rpr}<w:t xml:space="preserve">{xml_text(text)}</w:t></w:r></w:p>'
+    )
+
+
+def iter_table_xml(columns, rows, widths=None):
+    """
+    XML таблицы (w:tbl) кусками по TABLE_ROWS_PER_CHUNK строк.
+
+    columns — заголовки, rows — итерируемый источник кортежей значений; строки не
+    накапливаются, поэтому память не зависит от размера таблицы.
+    """
+    widths = widths or [9000 // len(columns)] * len(columns)
+    yield (
+        '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/>'
+        '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" w:lastColumn="0" '
+        'w:noHBand="0" w:noVBand="1"/></w:tblPr><w:tblGrid>'
+        + ''.join(f'<w:gridCol w:w="{w}"/>' for w in widths)
+        + '</w:tblGrid>'
+    )
+    # Заголовок повторяется на каждой странице.
+    yield (
+        '<w:tr><w:trPr><w:tblHeader/></w:trPr>'
+        + ''.join(_HEADER_CELL_OPEN + xml_text(c) + _CELL_CLOSE for c in columns)
+        + '</w:tr>'
+    )
+
+    chunk = []
+    for row in rows:
+        chunk.append('<w:tr>' + ''.join(_CELL_OPEN + xml_text(v) + _CELL_CLOSE for v in row) + '</w:tr>')
+        if len(chunk) >= TABLE_ROWS_PER_CHUNK:
+            yield ''.join(chunk)
+            chunk.clear()
+    if chunk:
+        yield ''.join(chunk)
+    # Word требует абзац между таблицей и следующим элементом.
+    yield '</w:tbl><w:p/>'
+
+
+def write_docx_streaming(doc: Document, output_path: str, sections: dict):
+    """
+    Сохранение документа с подстановкой потоковых секций вместо заглушек.
+
+    sections: ключ заглушки -> функция без аргументов, возвращающая итератор XML-кусков.
+    Секции вызываются по очереди, в порядке заглушек в документе.
+    """
+    skeleton = io.BytesIO()
+    doc.save(skeleton)
+
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix='.docx', dir=os.path.dirname(os.path.abspath(output_path)))
+    os.close(tmp_fd)
+    try:
+        with zipfile.ZipFile(skeleton) as src, zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename != 'word/document.xml':
+                    dst.writestr(info, src.read(info.filename))
+                    continue
+
+                xml = src.read(info.filename).decode('utf-8')
+                with dst.open(info.filename, 'w', force_zip64=True) as out:
+                    pos = 0
+                    for match in PLACEHOLDER_RE.finditer(xml):
+                        out.write(xml[pos:match.start()].encode('utf-8'))
+                        for chunk in sections[match.group(1)]():
+                            out.write(chunk.encode('utf-8'))
+                        pos = match.end()
+                    out.write(xml[pos:].encode('utf-8'))
+        shutil.move(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def open_inventory_app(database_url: str | None = None):
+    """
+    Приложение Flask для чтения данных инвентаря (БД из DATABASE_URL или указанная).
+
+    Отчёт только читает БД: схема не создаётся и не мигрирует, фоновые потоки не запускаются.
+    """
+    from app import create_app
+
+    config = {'AUTO_CREATE_SCHEMA': False, 'START_BACKGROUND_THREADS': False}
+    if database_url:
+        config['SQLALCHEMY_DATABASE_URI'] = database_url
+    return create_app(config)
+
+
+def iter_category_rows(category: str, batch_size: int = 2000):
+    """
+    Строки товаров категории, читаются из БД пачками (нужен контекст приложения).
+
+    При шардировании шарды читаются по очереди: диапазоны id шардов возрастают,
+    поэтому строки остаются упорядоченными по id.
+    """
+    from sqlalchemy.orm import Session
+
+    from app.extensions import db
+    from app.sharding import get_shard_router
+
+    shards = get_shard_router()
+    if shards is None:
+        yield from _category_rows(db.session, category, batch_size)
+        return
+    for index in shards.shards_for_category(category):
+        with Session(shards.engines[index]) as session:
+            yield from _category_rows(session, category, batch_size)
+
+
+def _category_rows(session, category: str, batch_size: int):
+    from sqlalchemy import select
+
+    from app.categories import category_condition
+    from app.models import Item, format_cents
+
+    stmt = (
+        select(Item)
+        .where(category_condition(session, category))
+        .order_by(Item.id.asc())
+        .execution_options(yield_per=batch_size)
+    )
+    for item in session.scalars(stmt):
+        yield item.id, item.name, item.quantity, format_cents(item.price_cents)
+
+
+def add_inventory_section(doc: Document, summary: dict) -> dict:
+    """
+    Приложение с данными инвентаря: итоги, таблица по категориям и товары каждой категории.
+
+    Возвращает секции для write_docx_streaming; товары категорий читаются из БД
+    в момент записи документа, по одной категории за раз.
+    """
+    doc.add_page_break()
+    add_heading_style(doc, 1, 'ПРИЛОЖЕНИЕ Б. ДАННЫЕ ИНВЕНТАРЯ', center=True)
+    add_regular_paragraph(doc, f"Общая стоимость товаров на складе: {summary['total_value']:.2f}.")
+    add_regular_paragraph(
+        doc,
+        f"Товаров с нулевым или отрицательным количеством: {len(summary['items_with_non_positive_quantity'])}.",
+    )
+
+    add_heading_style(doc, 2, 'Сводка по категориям')
+    add_placeholder(doc, 'categories')
+    add_heading_style(doc, 2, 'Товары по категориям')
+    add_placeholder(doc, 'items')
+
+    def categories_xml():
+        rows = (
+            (c['category'], c['items_count'], c['total_quantity'], f"{c['total_value']:.2f}")
+            for c in summary['categories']
+        )
+        yield from iter_table_xml(['Категория', 'Позиций', 'Количество', 'Стоимость'], rows)
+
+    def items_xml():
+        for c in summary['categories']:
+            yield paragraph_xml(f"{c['category']} ({c['items_count']} поз.)", bold=True)
+            yield from iter_table_xml(
+                ['ID', 'Название', 'Количество', 'Цена'],
+                iter_category_rows(c['category']),
+                widths=[1200, 4800, 1500, 1500],
+            )
+
+    return {'categories': categories_xml, 'items': items_xml}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Генерация docx отчёта по РГЗ.')
+    parser.add_argument('--inventory', action='store_true', help='добавить данные инвентаря из DATABASE_URL')
+    parser.add_argument('--database-url', help='добавить данные инвентаря из указанной БД')
+    parser.add_argument('--output', default='РГЗ_Вариант12_Отчет.docx', help='путь к docx файлу')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     doc = Document()
     setup_document_style(doc)
     
@@ -482,12 +703,26 @@ def main():
             add_code_block(doc, code)
             doc.add_paragraph()  # Пустая строка между файлами
     
+    # Данные инвентаря (опционально)
+    inventory_app = None
+    sections = {}
+    if args.inventory or args.database_url:
+        from app.api import _build_summary_payload
+
+        inventory_app = open_inventory_app(args.database_url)
+        with inventory_app.app_context():
+            sections = add_inventory_section(doc, _build_summary_payload())
+    
     # Настройка нумерации страниц
     setup_page_numbers(doc)
     
     # Сохранение документа
-    output_path = 'РГЗ_Вариант12_Отчет.docx'
-    doc.save(output_path)
+    output_path = args.output
+    if inventory_app is not None:
+        with inventory_app.app_context():
+            write_docx_streaming(doc, output_path, sections)
+    else:
+        doc.save(output_path)
     print(f"Отчёт сохранён в файл: {output_path}")
 
 
@@ -0,0 +1,81 @@
+"""
+Production entry point (Linux/macOS): gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and forked into workers. Each
+worker drops the inherited connection pools and starts its own background threads
+(see app/serving.py). Workers, threads and pool size are derived from the CPU count
+and the database's max_connections; WEB_CONCURRENCY / WEB_THREADS override them.
+
+In-memory state is per worker: SSE history (each worker reads events from the database),
+admission limits, report coalescing. The read-your-writes pin reaches other workers only
+through its signed cookie (SECRET_KEY).
+
+Graceful reload: ``kill -HUP <master pid>`` re-reads this file and replaces workers one
+by one with new ones forked from the preloaded app. To deploy new code, start a new master
+with ``kill -USR2 <master pid>`` and then stop the old one with ``kill -TERM <old pid>``.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+from app.serving import detect_max_connections, plan_capacity
+
+load_dotenv(override=False)
+
+# The master only imports the app; threads are started per worker in post_fork.
+os.environ["START_BACKGROUND_THREADS"] = "0"
+
+_max_connections = (
+    int(os.environ["DB_MAX_CONNECTIONS"])
+    if os.environ.get("DB_MAX_CONNECTIONS")
+    else detect_max_connections(os.environ.get("DATABASE_URL", "sqlite:///inventory.db"))
+)
+_capacity = plan_capacity(multiprocessing.cpu_count(), _max_connections)
+
+wsgi_app = "wsgi:app"
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+preload_app = True
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", _capacity.workers))
+threads = int(os.environ.get("WEB_THREADS", _capacity.threads))
+
+# One pooled connection per request thread.
+os.environ.setdefault("DB_POOL_SIZE", str(threads))
+os.environ.setdefault("WEB_THREADS", str(threads))
+os.environ.setdefault("DB_MAX_OVERFLOW", str(_capacity.max_overflow))
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot accumulate.
+max_requests = 10000
+max_requests_jitter = 1000
+
+
+def when_ready(server):
+    # Close the connections the master opened while preloading (create_all, migrations),
+    # so no worker starts with a socket it shares with the master.
+    from app.serving import app_engines
+    from wsgi import app
+
+    for engine in app_engines(app):
+        engine.dispose()
+    server.log.info(
+        "Serving with %s workers x %s threads, pool size %s (max_connections: %s)",
+        workers, threads, os.environ["DB_POOL_SIZE"], _max_connections or "unlimited",
+    )
+
+
+def post_fork(server, worker):
+    from app.serving import start_worker
+    from wsgi import app
+
+    start_worker(app)
+
+
+def worker_exit(server, worker):
+    from app.serving import stop_worker
+    from wsgi import app
+
+    stop_worker(app)
@@ -7,12 +7,15 @@ from app.extensions import db
 
 
 @pytest.fixture()
-def app(tmp_path):
+def make_app(tmp_path):
     """
-    Test app factory.
+    Test app factory: ``make_app(**config)`` with extra config on top of the defaults.
 
     - If TEST_DATABASE_URL is set, tests will run against that DB (e.g. Postgres in CI).
     - Otherwise, uses a temporary SQLite file.
+
+    Every app of a test shares that database (e.g. two apps standing in for two workers);
+    the schema is recreated for the first one and dropped at the end of the test.
     """
 
     test_db_url = os.getenv("TEST_DATABASE_URL")
@@ -21,25 +24,36 @@ def app(tmp_path):
     else:
         db_uri = f"sqlite:///{tmp_path / 'test.db'}"
 
-    app = create_app(
-        {
-            "TESTING": True,
-            "SQLALCHEMY_DATABASE_URI": db_uri,
-        }
-    )
+    apps = []
 
-    with app.app_context():
-        db.drop_all()
-        db.create_all()
+    def factory(**config):
+        app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": db_uri,
+                **config,
+            }
+        )
+        with app.app_context():
+            if not apps:
+                db.drop_all()
+            db.create_all()
+        apps.append(app)
+        return app
 
-    yield app
+    yield factory
 
-    with app.app_context():
-        db.session.remove()
-        db.drop_all()
+    if apps:
+        with apps[0].app_context():
+            db.session.remove()
+            db.drop_all()
+
+
+@pytest.fixture()
+def app(make_app):
+    return make_app()
 
 
 @pytest.fixture()
 def client(app):
     return app.test_client()
-
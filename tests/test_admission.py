@@ -0,0 +1,47 @@
+import pytest
+
+@pytest.fixture()
+def limited_app(make_app):
+    return make_app(
+        ADMISSION_CONTROL_ENABLED=True,
+        ADMISSION_POOLS={
+            "read": {"max_concurrent": 1, "rate": None, "burst": None},
+            "write": {"max_concurrent": 8, "rate": None, "burst": None},
+            "heavy": {"max_concurrent": 2, "rate": 0.01, "burst": 1},
+        },
+    )
+
+
+def test_heavy_requests_are_rate_limited(limited_app):
+    client = limited_app.test_client()
+    assert client.get("/reports/summary").status_code == 200
+
+    resp = client.get("/reports/summary?format=csv")
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+
+    # Cheap reads use their own pool and are not affected.
+    assert client.get("/items/1").status_code == 404
+
+
+def test_saturated_pool_fails_fast(limited_app):
+    client = limited_app.test_client()
+    pool = limited_app.extensions["admission"].pools["read"]
+    pool.acquire()  # simulate a request in flight
+    try:
+        resp = client.get("/items/1")
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+    finally:
+        pool.release()
+
+    assert client.get("/items/1").status_code == 404
+
+    stats = client.get("/metrics").get_json()["admission"]
+    assert stats["read"]["rejected_concurrency"] == 1
+    assert stats["read"]["in_flight"] == 0
+
+
+def test_admission_control_is_opt_in(app, client):
+    assert "admission" not in app.extensions
+    assert all(client.get("/items").status_code == 200 for _ in range(20))
@@ -0,0 +1,79 @@
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+def _create(client, name, quantity, price, category="office"):
+    return client.post(
+        "/items", json={"name": name, "quantity": quantity, "price": price, "category": category}
+    ).get_json()
+
+
+def test_bulk_update_is_one_statement(app, client):
+    _create(client, "Pen", 10, "1.99")
+    _create(client, "Clip", 1, "0.05")
+    other = _create(client, "Mouse", 5, 10, category="electronics")
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    resp = client.patch("/items?category=office", json={"price": {"percent": -10}, "quantity": {"add": -3}})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"matched": 2, "updated": 2}
+    assert sum(s.lstrip().upper().startswith("UPDATE") for s in statements) == 1
+
+    items = {i["name"]: i for i in client.get("/items?money=exact").get_json()}
+    # 1.99 * 0.9 = 1.791 -> 1.79; 0.05 * 0.9 = 0.045 -> 0.05 (half up); quantity clamps at 0.
+    assert (items["Pen"]["price"], items["Pen"]["quantity"]) == ("1.79", 7)
+    assert (items["Clip"]["price"], items["Clip"]["quantity"]) == ("0.05", 0)
+    assert items["Mouse"]["updated_at"] == other["updated_at"]
+
+    app.config["SYNC_SAFETY_LAG_SECONDS"] = 0
+    changes = client.get("/items/changes", query_string={"limit": 5}).get_json()
+    assert [i["name"] for i in changes["upserted"][-2:]] == ["Pen", "Clip"]
+
+
+def test_bulk_update_validation_and_dry_run(client):
+    _create(client, "Pen", 10, 2)
+
+    assert client.patch("/items", json={"price": {"set": 1}}).status_code == 400
+    assert client.patch("/items?category=office", json={"price": {"double": 1}}).status_code == 400
+    assert client.patch("/items?category=office", json={"price": {"percent": -100}}).status_code == 400
+    assert client.patch("/items?category=office", json={"price": {"set": "-1e30"}}).status_code == 400
+    assert client.patch("/items?category=office", json={"price": {"percent": "1e1000000"}}).status_code == 400
+    assert client.patch("/items?category=office", json={"name": {"set": "x"}}).status_code == 400
+
+    resp = client.patch("/items?category=office&dry_run=1", json={"price": {"set": 5}})
+    assert resp.get_json() == {"matched": 1, "dry_run": True}
+    assert client.get("/items").get_json()[0]["price"] == 2.0
+
+
+def test_bulk_quantity_stays_within_integer_range(client):
+    _create(client, "Bolt", 2_000_000_000, 1, category="bulk")
+
+    assert client.patch("/items?category=bulk", json={"quantity": {"add": 10**20}}).status_code == 400
+    assert client.patch("/items?category=bulk", json={"quantity": {"set": 10**20}}).status_code == 400
+    assert client.patch("/items?category=bulk", json={"quantity": {"add": -(2**31)}}).status_code == 400
+
+    # Computed as BIGINT and clamped to the INTEGER column (no overflow on Postgres).
+    assert client.patch("/items?category=bulk", json={"quantity": {"percent": 10000}}).status_code == 200
+    assert client.get("/items").get_json()[0]["quantity"] == 2**31 - 1
+
+
+def test_bulk_delete_writes_tombstones_and_respects_cap(app, client):
+    low = [_create(client, f"Low{n}", n, 1)["id"] for n in range(3)]
+    _create(client, "Full", 50, 1)
+
+    resp = client.delete("/items?category=office&quantity_lte=2&max_rows=2")
+    assert resp.status_code == 409
+    assert resp.get_json()["details"] == {"matched": 3, "max_rows": 2}
+
+    assert client.delete("/items?category=office&quantity_lte=2&dry_run=1").get_json() == {
+        "matched": 3,
+        "dry_run": True,
+    }
+    resp = client.delete("/items?category=office&quantity_lte=2")
+    assert resp.get_json() == {"matched": 3, "deleted": 3}
+    assert [i["name"] for i in client.get("/items").get_json()] == ["Full"]
+    app.config["SYNC_SAFETY_LAG_SECONDS"] = 0
+    assert client.get("/items/changes").get_json()["deleted"] == low
@@ -0,0 +1,56 @@
+from sqlalchemy import event
+
+from app.categories import session_categories
+from app.extensions import db
+from app.models import Category, Item
+
+
+def test_items_reference_category_dictionary(app, client):
+    for n in range(4):
+        client.post("/items", json={"name": f"I{n}", "quantity": 1, "price": 1, "category": f"cat{n % 2}"})
+    item = client.get("/items?category=cat1").get_json()[0]
+    client.put(f"/items/{item['id']}", json={"category": "cat2"})
+
+    with app.app_context():
+        assert sorted(c.name for c in Category.query) == ["cat0", "cat1", "cat2"]
+        assert len({i.category_id for i in Item.query}) == 3
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    listed = client.get("/items?category=cat0").get_json()
+    summary = client.get("/reports/summary").get_json()
+
+    assert [i["category"] for i in listed] == ["cat0", "cat0"]
+    assert [c["category"] for c in summary["categories"]] == ["cat0", "cat1", "cat2"]
+    # Names and ids come from the in-process cache.
+    assert not any("FROM categories" in s for s in statements)
+    assert client.get("/items?category=unknown").get_json() == []
+
+
+def test_cold_cache_works_with_one_connection_per_thread(make_app):
+    seed_client = make_app().test_client()
+    for n in range(3):
+        seed_client.post("/items", json={"name": f"I{n}", "quantity": 0, "price": 1, "category": f"cat{n}"})
+
+    # A fresh engine (as in a newly forked worker) with the pool gunicorn.conf.py builds.
+    app = make_app(SQLALCHEMY_ENGINE_OPTIONS={"pool_size": 1, "max_overflow": 0, "pool_timeout": 1})
+    client = app.test_client()
+    assert [i["category"] for i in client.get("/items").get_json()] == ["cat0", "cat1", "cat2"]
+    assert len(client.get("/reports/summary").get_json()["categories"]) == 3
+    assert client.put("/items/1", json={"category": "fresh"}).get_json()["category"] == "fresh"
+    assert client.post("/items", json={"name": "N", "quantity": 1, "price": 1, "category": "new"}).status_code == 201
+
+
+def test_rolled_back_category_is_not_cached(app):
+    with app.app_context():
+        cache = session_categories(db.session)
+        category_id = cache.id_for(db.session, "ghost", create=True)
+        assert cache.id_for(db.session, "ghost") == category_id
+        db.session.rollback()
+
+        assert cache.snapshot()["cached"] == 0
+        assert cache.id_for(db.session, "ghost") is None
+        assert cache.id_for(db.session, "kept", create=True) is not None
+        db.session.commit()
+        assert cache.snapshot()["cached"] == 1
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+EVENTS_CONFIG = {
+    "SYNC_SAFETY_LAG_SECONDS": 0,
+    "EVENTS_KEEPALIVE_SECONDS": 0.01,
+    "EVENTS_BUFFER_SIZE": 3,
+    "EVENTS_LOW_STOCK_THRESHOLD": 2,
+}
+
+
+@pytest.fixture()
+def events_app(make_app):
+    return make_app(**EVENTS_CONFIG)
+
+
+def _read_events(resp, count):
+    """Collect `count` SSE events (skipping comments/retry) from a streaming response."""
+    events = []
+    chunks = iter(resp.response)
+    while len(events) < count:
+        chunk = next(chunks)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith(("retry:", ":")):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+        events.append({"id": fields.get("id"), "event": fields["event"], "data": json.loads(fields["data"])})
+    resp.close()
+    return events
+
+
+def _subscribe(client, url, **kwargs):
+    resp = client.get(url, buffered=False, **kwargs)
+    chunks = iter(resp.response)
+    next(chunks)  # retry hint; the subscriber is now registered
+    return resp, chunks
+
+
+def test_deletion_reaches_category_subscribers(events_app):
+    client = events_app.test_client()
+    feed = events_app.extensions["event_feed"]
+    resp, _ = _subscribe(client, "/events?category=cat1&low_stock=1")
+    assert resp.mimetype == "text/event-stream"
+
+    first = client.post("/items", json={"name": "A", "quantity": 10, "price": 1, "category": "cat1"}).get_json()
+    client.post("/items", json={"name": "B", "quantity": 10, "price": 1, "category": "cat2"})
+    assert feed.poll() == 2
+    # Changes between two polls collapse into the latest state, as in delta sync.
+    client.put(f"/items/{first['id']}", json={"quantity": 1})
+    client.delete(f"/items/{first['id']}")
+    assert feed.poll() == 1
+
+    created, deleted = _read_events(resp, 2)
+    assert created["event"] == "item.created" and created["data"]["item"]["name"] == "A"
+    assert deleted["event"] == "item.deleted"
+    assert deleted["data"]["item"] == {"id": first["id"], "category": "cat1"}
+
+
+def test_feed_holds_back_changes_younger_than_the_sync_lag(events_app):
+    events_app.config["SYNC_SAFETY_LAG_SECONDS"] = 60
+    events_app.test_client().post("/items", json={"name": "A", "quantity": 10, "price": 1, "category": "c"})
+    assert events_app.extensions["event_feed"].poll() == 0
+
+
+def test_slow_consumer_is_disconnected(events_app):
+    client = events_app.test_client()
+    broker = events_app.extensions["events"]
+    resp, chunks = _subscribe(client, "/events")
+
+    for n in range(5):
+        client.post("/items", json={"name": f"I{n}", "quantity": 10, "price": 1, "category": "c"})
+    events_app.extensions["event_feed"].poll()
+
+    rest = [c.decode() if isinstance(c, bytes) else c for c in chunks]
+    assert rest[-1].startswith("event: overflow")
+    assert broker.snapshot()["subscribers"] == 0
+    assert broker.snapshot()["disconnected_slow_consumers"] == 1
+
+
+def test_resume_backlog_larger_than_buffer_resets(events_app):
+    client = events_app.test_client()
+    feed = events_app.extensions["event_feed"]
+    client.post("/items", json={"name": "first", "quantity": 10, "price": 1, "category": "c"})
+    feed.poll()
+    first_id = events_app.extensions["events"].snapshot()["last_event_id"]
+    for n in range(4):
+        client.post("/items", json={"name": f"I{n}", "quantity": 10, "price": 1, "category": "c"})
+    feed.poll()
+    last_id = events_app.extensions["events"].snapshot()["last_event_id"]
+
+    # 4 missed events do not fit into a buffer of 3: resync instead of overflowing forever.
+    resp = client.get("/events", headers={"Last-Event-ID": first_id}, buffered=False)
+    (reset,) = _read_events(resp, 1)
+    assert reset == {"id": last_id, "event": "reset", "data": {}}
+
+    client.post("/items", json={"name": "late", "quantity": 10, "price": 1, "category": "c"})
+    feed.poll()
+    resp = client.get("/events", headers={"Last-Event-ID": reset["id"]}, buffered=False)
+    (event,) = _read_events(resp, 1)
+    assert event["data"]["item"]["name"] == "late"
+
+    # Ids that are not cursors (e.g. from before an upgrade) resync as well.
+    resp = client.get("/events", headers={"Last-Event-ID": "5"}, buffered=False)
+    assert _read_events(resp, 1)[0]["event"] == "reset"
+
+
+def test_write_reaches_subscribers_of_every_worker(make_app):
+    # Two app instances on one database stand in for two gunicorn workers.
+    writer, reader = make_app(**EVENTS_CONFIG), make_app(**EVENTS_CONFIG)
+
+    resp, _ = _subscribe(reader.test_client(), "/events?category=cat1&low_stock=1")
+    client = writer.test_client()
+    item = client.post("/items", json={"name": "A", "quantity": 10, "price": 1, "category": "cat1"}).get_json()
+    writer.extensions["event_feed"].poll()
+    reader.extensions["event_feed"].poll()
+    client.put(f"/items/{item['id']}", json={"quantity": 1})
+    for app in (writer, reader):
+        app.extensions["event_feed"].poll()
+
+    events = _read_events(resp, 3)
+    assert [e["event"] for e in events] == ["item.created", "item.updated", "stock.low"]
+    assert events[1]["data"]["item"]["quantity"] == 1
+    assert events[2]["data"]["item_id"] == item["id"]
+
+    # Ids are delta-sync cursors, so a client can resume on the other worker.
+    resp = writer.test_client().get("/events?category=cat1", headers={"Last-Event-ID": events[0]["id"]}, buffered=False)
+    (resumed,) = _read_events(resp, 1)
+    assert resumed["event"] == "item.updated" and resumed["id"] == events[1]["id"]
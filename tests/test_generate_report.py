@@ -0,0 +1,34 @@
+import threading
+
+from docx import Document
+from sqlalchemy import create_engine, inspect
+
+import generate_report
+from app.api import _build_summary_payload
+
+
+def test_streamed_inventory_tables_open_in_python_docx(app, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_report, "TABLE_ROWS_PER_CHUNK", 2)
+    client.post("/items", json={"name": "n<&\x01", "quantity": 0, "price": 1, "category": "c\x0b1"})
+    for n in range(4):
+        client.post("/items", json={"name": f"Item {n}", "quantity": n, "price": "2.50", "category": "c\x0b1"})
+
+    doc = Document()
+    path = tmp_path / "report.docx"
+    with app.app_context():
+        sections = generate_report.add_inventory_section(doc, _build_summary_payload())
+        generate_report.write_docx_streaming(doc, str(path), sections)
+
+    categories, items = Document(str(path)).tables
+    assert [c.text for c in categories.rows[1].cells] == ["c1", "5", "6", "15.00"]
+    assert [r.cells[1].text for r in items.rows] == ["Название", "n<&", "Item 0", "Item 1", "Item 2", "Item 3"]
+    assert items.rows[2].cells[3].text == "2.50"
+
+
+def test_inventory_app_does_not_touch_schema(tmp_path):
+    url = f"sqlite:///{tmp_path / 'empty.db'}"
+    inventory_app = generate_report.open_inventory_app(url)
+
+    assert inspect(create_engine(url)).get_table_names() == []
+    assert not inventory_app.testing
+    assert not any(t.name == "db-heartbeat" for t in threading.enumerate())
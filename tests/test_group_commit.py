@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+@pytest.fixture()
+def grouped_app(make_app):
+    return make_app(GROUP_COMMIT_ENABLED=True, GROUP_COMMIT_WINDOW_MS=200, GROUP_COMMIT_MAX_BATCH=4)
+
+
+def test_concurrent_creates_share_commits(grouped_app):
+    statuses = []
+
+    def create(n):
+        resp = grouped_app.test_client().post(
+            "/items",
+            json={"name": f"Item{n}", "quantity": n, "price": 10, "category": "batch"},
+        )
+        statuses.append(resp.status_code)
+
+    threads = [threading.Thread(target=create, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert statuses == [201] * 8
+    client = grouped_app.test_client()
+    assert len(client.get("/items").get_json()) == 8
+
+    stats = client.get("/metrics").get_json()["group_commit"]
+    assert stats["operations"] == 8
+    assert stats["batches"] < 8
+    assert max(int(size) for size in stats["batch_sizes"]) <= 4
+
+
+def test_grouped_update_and_missing_item(grouped_app):
+    client = grouped_app.test_client()
+    item_id = client.post(
+        "/items",
+        json={"name": "Mouse", "quantity": 5, "price": 999.99, "category": "electronics"},
+    ).get_json()["id"]
+
+    resp = client.put(f"/items/{item_id}", json={"quantity": 7})
+    assert resp.status_code == 200
+    assert resp.get_json()["quantity"] == 7
+
+    assert client.put("/items/999", json={"quantity": 1}).status_code == 404
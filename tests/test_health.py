@@ -0,0 +1,38 @@
+from app import create_app
+
+
+def test_livez_and_readyz_do_not_query_the_database(app, client, monkeypatch):
+    heartbeat = app.extensions["heartbeat"]
+
+    assert client.get("/livez").get_json() == {"status": "ok"}
+    resp = client.get("/readyz")
+    assert resp.status_code == 503 and resp.get_json()["status"] == "starting"
+
+    heartbeat.beat()
+    resp = client.get("/readyz")
+    assert resp.status_code == 200
+    primary = resp.get_json()["databases"]["primary"]
+    assert primary["ready"] is True
+    assert primary["heartbeat_latency_ms"] is not None
+    assert set(primary["pool"]) == {"checked_out", "capacity", "saturation"}
+
+    # The cached status goes stale without new beats.
+    monkeypatch.setattr(heartbeat, "stale_after", 0)
+    assert client.get("/readyz").status_code == 503
+
+
+def test_readyz_reports_unreachable_database(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'missing' / 'nowhere.db'}",
+        }
+    )
+    app.extensions["heartbeat"].beat()
+
+    resp = app.test_client().get("/readyz")
+    assert resp.status_code == 503
+    data = resp.get_json()
+    assert data["status"] == "unavailable"
+    assert data["databases"]["primary"]["error"] == "OperationalError"
+    assert app.test_client().get("/livez").status_code == 200
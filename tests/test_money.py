@@ -0,0 +1,67 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app import create_app
+from app.extensions import db
+from app.migrations import upgrade_schema
+
+
+def test_sums_are_exact_in_cents(client):
+    for _ in range(3):
+        client.post("/items", json={"name": "Clip", "quantity": 1, "price": "0.10", "category": "office"})
+    client.post("/items", json={"name": "Pen", "quantity": 3, "price": 0.7, "category": "office"})
+
+    summary = client.get("/reports/summary").get_json()
+    assert summary["total_value"] == 2.4
+    exact = client.get("/reports/summary?money=exact").get_json()
+    assert exact["total_value"] == "2.40"
+    assert exact["categories"][0]["total_value"] == "2.40"
+
+    items = client.get("/items?money=exact").get_json()
+    assert [i["price"] for i in items] == ["0.10", "0.10", "0.10", "0.70"]
+    assert client.get("/items").get_json()[0]["price"] == 0.1
+    assert client.get("/items?money=cents").status_code == 400
+
+
+def test_price_validation_in_cents(client):
+    def create(price):
+        return client.post("/items", json={"name": "A", "quantity": 1, "price": price, "category": "c"})
+
+    assert create("0.004").status_code == 400
+    assert create("NaN").status_code == 400
+    assert create("10000000000").status_code == 400
+    assert create("-1e30").status_code == 400
+    assert create(-5).status_code == 400
+    assert create("19.995").get_json()["price"] == 20.0
+
+
+def test_upgrade_converts_numeric_price_column(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(uri)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR(200) NOT NULL, "
+                "quantity INTEGER NOT NULL, price NUMERIC(12, 2) NOT NULL, category VARCHAR(100) NOT NULL, "
+                "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO items (name, quantity, price, category, created_at, updated_at) VALUES "
+                "('A', 3, 19.99, 'c', '2026-01-01 00:00:00', '2026-01-01 00:00:00'), "
+                "('B', 1, 0.07, 'c', '2026-01-01 00:00:00', '2026-01-01 00:00:00')"
+            )
+        )
+
+    # Same order as create_app: create missing tables, then migrate.
+    db.metadata.create_all(engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)
+    assert "price" not in {c["name"] for c in inspect(engine).get_columns("items")}
+
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": uri})
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    assert [i["price"] for i in client.get("/items?money=exact").get_json()] == ["19.99", "0.07"]
+    assert client.get("/reports/summary?money=exact").get_json()["total_value"] == "60.04"
@@ -0,0 +1,91 @@
+import os
+import pstats
+import threading
+import time
+
+import pytest
+
+from app.profiling import StackSampler
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture()
+def make_profiled_app(make_app, tmp_path):
+    def factory(**config):
+        return make_app(
+            PROFILING_ENABLED=True,
+            PROFILING_TOKEN=TOKEN,
+            PROFILING_DIR=str(tmp_path / "profiles"),
+            **config,
+        )
+
+    return factory
+
+
+def test_disabled_profiler_installs_nothing(app, client):
+    assert "profiler" not in app.extensions
+    assert app.before_request_funcs.get(None, []) == []
+    assert client.get("/debug/profiles", headers={"X-Profile-Token": TOKEN}).status_code == 404
+
+
+def test_token_header_captures_request(make_profiled_app, tmp_path):
+    app = make_profiled_app()
+    client = app.test_client()
+
+    assert client.get("/items").status_code == 200
+    assert client.get("/items", headers={"X-Profile-Token": "wrong"}).status_code == 200
+    assert not (tmp_path / "profiles").exists()
+
+    headers = {"X-Profile-Token": TOKEN, "X-Profile-Format": "pstats"}
+    assert client.get("/items", headers=headers).status_code == 200
+
+    assert client.get("/debug/profiles").status_code == 403
+    captures = client.get("/debug/profiles", headers={"X-Profile-Token": TOKEN}).get_json()["captures"]
+    assert len(captures) == 1
+    capture = captures[0]
+    assert capture["format"] == "pstats"
+    assert capture["method"] == "GET" and capture["endpoint"] == "api.list_items"
+
+    pstats.Stats(str(tmp_path / "profiles" / capture["name"]))  # a valid stats dump
+    resp = client.get(f"/debug/profiles/{capture['name']}", headers={"X-Profile-Token": TOKEN})
+    assert resp.status_code == 200 and resp.data
+    assert client.get("/debug/profiles/test.db", headers={"X-Profile-Token": TOKEN}).status_code == 404
+    assert app.extensions["metrics"]["profiling"]()["captured"] == 1
+
+
+def test_sampling_respects_endpoint_filter_and_limits(make_profiled_app, tmp_path):
+    app = make_profiled_app(PROFILING_SAMPLE_RATE=1.0, PROFILING_ENDPOINTS=["api.livez"], PROFILING_MAX_FILES=2)
+    client = app.test_client()
+    profiles = tmp_path / "profiles"
+
+    client.get("/livez")
+    (stale,) = os.listdir(profiles)
+    old = time.time() - 2 * 86400
+    os.utime(profiles / stale, (old, old))
+
+    for _ in range(3):
+        client.get("/livez")
+    client.get("/")  # not in PROFILING_ENDPOINTS
+
+    names = os.listdir(profiles)
+    assert len(names) == 2 and stale not in names
+    assert all("api.livez" in name and name.endswith(".collapsed") for name in names)
+
+
+def test_stack_sampler_writes_collapsed_stacks():
+    def busy_wait(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    sampler = StackSampler(threading.get_ident(), 0.001)
+    sampler.start()
+    busy_wait(0.1)
+    sampler.stop()
+
+    lines = sampler.collapsed().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1].startswith("busy_wait (test_profiling.py:")
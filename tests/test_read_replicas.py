@@ -0,0 +1,167 @@
+import threading
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import api, create_app
+from app.categories import category_cache
+from app.extensions import db
+from app.models import Item
+
+
+@pytest.fixture()
+def replica_app(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SQLALCHEMY_REPLICA_URIS": [f"sqlite:///{tmp_path / 'replica.db'}"],
+            "REPLICA_READ_YOUR_WRITES_SECONDS": 60,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        # In production the replica is fed by replication; here we create its schema by hand.
+        db.metadata.create_all(app.extensions["replica_router"].engines["replica_0"])
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(app.extensions["replica_router"].engines["replica_0"])
+
+
+def _seed_replica(app, name):
+    with app.app_context():
+        engine = app.extensions["replica_router"].engines["replica_0"]
+        with Session(engine) as session:
+            category_id = category_cache(engine).id_for(session, "replica", create=True)
+            session.execute(
+                insert(Item.__table__).values(
+                    name=name, quantity=1, price_cents=100, category_id=category_id,
+                    created_at=db.func.now(), updated_at=db.func.now(),
+                )
+            )
+            session.commit()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replica_app):
+    _seed_replica(replica_app, "only-on-replica")
+    client = replica_app.test_client()
+
+    names = [i["name"] for i in client.get("/items").get_json()]
+    assert names == ["only-on-replica"]
+
+    summary = client.get("/reports/summary").get_json()
+    assert [c["category"] for c in summary["categories"]] == ["replica"]
+
+    resp = client.post(
+        "/items",
+        json={"name": "Keyboard", "quantity": 1, "price": 10, "category": "primary"},
+        headers={"X-Client-Id": "writer"},
+    )
+    assert resp.status_code == 201
+    with replica_app.app_context():
+        assert db.session.query(Item).filter_by(name="Keyboard").count() == 1
+
+    # Other clients still read from the (lagging) replica.
+    reader = replica_app.test_client()
+    names = [i["name"] for i in reader.get("/items", headers={"X-Client-Id": "reader"}).get_json()]
+    assert names == ["only-on-replica"]
+
+
+def test_writer_is_pinned_to_primary(replica_app):
+    _seed_replica(replica_app, "only-on-replica")
+    client = replica_app.test_client()
+
+    client.post(
+        "/items",
+        json={"name": "Keyboard", "quantity": 1, "price": 10, "category": "primary"},
+        headers={"X-Client-Id": "writer"},
+    )
+    names = [i["name"] for i in client.get("/items", headers={"X-Client-Id": "writer"}).get_json()]
+    assert names == ["Keyboard"]
+
+
+def test_pin_cookie_holds_across_processes(replica_app):
+    _seed_replica(replica_app, "only-on-replica")
+    # A second app over the same databases stands in for another gunicorn worker.
+    other_worker = create_app({**replica_app.config, "TESTING": True})
+    client = replica_app.test_client()
+
+    client.post("/items", json={"name": "Keyboard", "quantity": 1, "price": 10, "category": "primary"})
+    cookie = client.get_cookie("db_pin")
+    assert cookie is not None
+
+    follower = other_worker.test_client()
+    assert [i["name"] for i in follower.get("/items").get_json()] == ["only-on-replica"]
+    follower.set_cookie("db_pin", cookie.value)
+    assert [i["name"] for i in follower.get("/items").get_json()] == ["Keyboard"]
+
+    # Change the signed payload: the last base64 character of the signature may only carry
+    # padding bits, so editing it can leave the signature valid.
+    follower.set_cookie("db_pin", cookie.value.replace("primary", "replica", 1))
+    assert [i["name"] for i in follower.get("/items").get_json()] == ["only-on-replica"]
+
+
+def test_write_does_not_pin_other_clients_behind_one_address(replica_app):
+    _seed_replica(replica_app, "only-on-replica")
+    # Behind a reverse proxy every client has the proxy's address.
+    proxy = {"REMOTE_ADDR": "10.0.0.1"}
+    writer, other = replica_app.test_client(), replica_app.test_client()
+
+    writer.post(
+        "/items",
+        json={"name": "Keyboard", "quantity": 1, "price": 10, "category": "primary"},
+        environ_base=proxy,
+    )
+    assert [i["name"] for i in other.get("/items", environ_base=proxy).get_json()] == ["only-on-replica"]
+    # The writer itself stays pinned through its cookie.
+    assert [i["name"] for i in writer.get("/items", environ_base=proxy).get_json()] == ["Keyboard"]
+
+
+def test_unhealthy_replica_falls_back_to_primary(replica_app):
+    client = replica_app.test_client()
+    client.post(
+        "/items",
+        json={"name": "Keyboard", "quantity": 1, "price": 10, "category": "primary"},
+        headers={"X-Client-Id": "writer"},
+    )
+
+    router = replica_app.extensions["replica_router"]
+    router.health_interval = 3600
+    router.mark("replica_0", False)
+
+    names = [i["name"] for i in client.get("/items", headers={"X-Client-Id": "reader"}).get_json()]
+    assert names == ["Keyboard"]
+
+
+def test_pinned_writer_does_not_join_replica_summary(replica_app, monkeypatch):
+    _seed_replica(replica_app, "only-on-replica")
+    client = replica_app.test_client()
+    client.post(
+        "/items",
+        json={"name": "Keyboard", "quantity": 1, "price": 10, "category": "primary"},
+        headers={"X-Client-Id": "writer"},
+    )
+
+    started, release = threading.Event(), threading.Event()
+    original = api._build_summary_payload
+
+    def slow_summary(*args, **kwargs):
+        if not started.is_set():
+            started.set()
+            release.wait(5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(api, "_build_summary_payload", slow_summary)
+    reader_client = replica_app.test_client()
+    reader = threading.Thread(target=lambda: reader_client.get("/reports/summary", headers={"X-Client-Id": "reader"}))
+    reader.start()
+    started.wait(5)
+    try:
+        summary = client.get("/reports/summary", headers={"X-Client-Id": "writer"}).get_json()
+    finally:
+        release.set()
+        reader.join()
+    assert [c["category"] for c in summary["categories"]] == ["primary"]
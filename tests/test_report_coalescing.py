@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from app import api
+from app.singleflight import CoalescedTimeout, SingleFlight
+
+
+def test_concurrent_summary_requests_share_one_computation(make_app, monkeypatch):
+    app = make_app(
+        ADMISSION_CONTROL_ENABLED=True,
+        ADMISSION_POOLS={"heavy": {"max_concurrent": 4, "rate": 5.0, "burst": 10}},
+    )
+
+    calls = []
+    started = threading.Event()
+    original = api._build_summary_payload
+
+    def slow_summary(*args, **kwargs):
+        calls.append(1)
+        started.set()
+        time.sleep(0.3)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(api, "_build_summary_payload", slow_summary)
+
+    results = []
+
+    def fetch():
+        results.append(app.test_client().get("/reports/summary").status_code)
+
+    leader = threading.Thread(target=fetch)
+    leader.start()
+    started.wait(5)
+    # Far more waiters than the heavy pool's burst: they are not charged a rate token.
+    waiters = [threading.Thread(target=fetch) for _ in range(30)]
+    for t in waiters:
+        t.start()
+    for t in [leader, *waiters]:
+        t.join()
+
+    assert results == [200] * 31
+    assert len(calls) == 1
+
+    stats = app.test_client().get("/metrics").get_json()["report_coalescing"]
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 30
+    assert stats["in_flight"] == 0
+    heavy = app.test_client().get("/metrics").get_json()["admission"]["heavy"]
+    assert heavy["admitted"] == 1 and heavy["in_flight"] == 0
+
+
+def test_single_flight_propagates_errors_and_times_out():
+    flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(5)
+        raise ValueError("boom")
+
+    def run():
+        try:
+            flight.do("k", failing)
+        except ValueError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    while not flight.snapshot()["in_flight"]:
+        time.sleep(0.001)
+
+    with pytest.raises(CoalescedTimeout):
+        flight.do("k", lambda: "never called")
+
+    waiter = threading.Thread(target=run)
+    waiter.start()
+    release.set()
+    leader.join()
+    waiter.join()
+
+    assert len(errors) == 2
+    assert flight.snapshot()["errors"] == 1
+    assert flight.snapshot()["timeouts"] == 1
@@ -0,0 +1,22 @@
+import pytest
+
+from app.serving import FileLeaderLock, plan_capacity
+
+
+@pytest.mark.parametrize("cpus, max_connections", [(1, None), (4, 100), (16, 100), (8, 20), (64, 10)])
+def test_capacity_fits_connection_budget(cpus, max_connections):
+    capacity = plan_capacity(cpus, max_connections)
+    assert capacity.workers >= 1 and capacity.threads >= 1
+    assert capacity.pool_size == capacity.threads
+    if max_connections is None:
+        assert capacity.workers == 2 * cpus + 1
+    else:
+        assert capacity.connections <= max_connections - 5
+
+
+def test_leader_lock_has_one_holder(tmp_path):
+    path = str(tmp_path / "locks" / "snapshotter.lock")
+    first, second = FileLeaderLock(path), FileLeaderLock(path)
+    assert first() is True
+    assert second() is False
+    assert first() is True
@@ -0,0 +1,177 @@
+import itertools
+import threading
+
+import pytest
+from sqlalchemy import false
+
+import generate_report
+from app import api, create_app
+from app.extensions import db
+
+
+def _make_app(tmp_path, strategy, **config):
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SHARD_URIS": [f"sqlite:///{tmp_path / f'shard{n}.db'}" for n in range(3)],
+            "SHARD_STRATEGY": strategy,
+            "SHARD_ID_SPAN": 1000,
+            "SYNC_SAFETY_LAG_SECONDS": 0,
+            **config,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    app.extensions["shard_router"].prepare()
+    return app
+
+
+@pytest.fixture(params=["category", "id_range"])
+def sharded_app(tmp_path, request):
+    app = _make_app(tmp_path, request.param)
+    yield app
+    for engine in app.extensions["shard_router"].engines:
+        db.metadata.drop_all(engine)
+
+
+def _create(client, name, quantity, price, category):
+    resp = client.post(
+        "/items", json={"name": name, "quantity": quantity, "price": price, "category": category}
+    )
+    assert resp.status_code == 201
+    return resp.get_json()
+
+
+def test_items_are_spread_over_shards_and_merged(sharded_app):
+    client = sharded_app.test_client()
+    shards = sharded_app.extensions["shard_router"]
+    created = [_create(client, f"Item{n}", n, 10, f"cat{n % 4}") for n in range(8)]
+
+    used = {shards.shard_for_id(i["id"]) for i in created}
+    assert len(used) > 1
+
+    listed = client.get("/items").get_json()
+    assert [i["id"] for i in listed] == sorted(i["id"] for i in created)
+    assert [i["name"] for i in client.get("/items?category=cat1").get_json()] == ["Item1", "Item5"]
+
+    for item in created:
+        assert client.get(f"/items/{item['id']}").get_json()["name"] == item["name"]
+    assert client.get("/items/999999").status_code == 404
+
+    changes = client.get("/items/changes").get_json()
+    assert sorted(i["id"] for i in changes["upserted"]) == sorted(i["id"] for i in created)
+
+
+def test_summary_sums_partial_aggregates(sharded_app):
+    client = sharded_app.test_client()
+    _create(client, "Item1", 10, 100, "electronics")
+    _create(client, "Item2", 2, 50, "office")
+    item3 = _create(client, "Item3", 0, 200, "electronics")
+    _create(client, "Item4", 1, 1, "misc")
+
+    summary = client.get("/reports/summary").get_json()
+    assert summary["total_value"] == 1101.0
+    categories = {c["category"]: c for c in summary["categories"]}
+    assert categories["electronics"]["items_count"] == 2
+    assert categories["electronics"]["total_value"] == 1000.0
+    assert [i["id"] for i in summary["items_with_non_positive_quantity"]] == [item3["id"]]
+
+
+def test_update_and_delete_route_to_owning_shard(sharded_app):
+    client = sharded_app.test_client()
+    item = _create(client, "Mouse", 5, 10, "electronics")
+
+    resp = client.put(f"/items/{item['id']}", json={"quantity": 1})
+    assert resp.status_code == 200 and resp.get_json()["quantity"] == 1
+
+    assert client.delete(f"/items/{item['id']}").status_code == 204
+    assert client.get(f"/items/{item['id']}").status_code == 404
+    assert client.get("/items/changes").get_json()["deleted"] == [item["id"]]
+
+
+def test_category_sharding_rejects_cross_shard_move(tmp_path):
+    app = _make_app(tmp_path, "category")
+    shards = app.extensions["shard_router"]
+    client = app.test_client()
+    item = _create(client, "Mouse", 5, 10, "a")
+    other = next(c for c in ("b", "c", "d", "e", "f") if shards.shard_for_category(c) != shards.shard_for_category("a"))
+
+    assert client.put(f"/items/{item['id']}", json={"category": other}).status_code == 409
+
+
+def test_insert_past_the_shard_id_range_fails(tmp_path):
+    app = _make_app(tmp_path, "category", SHARD_ID_SPAN=3)
+    client = app.test_client()
+    created = [_create(client, f"Item{n}", n, 10, "full") for n in range(3)]
+
+    resp = client.post("/items", json={"name": "Spill", "quantity": 1, "price": 10, "category": "full"})
+    assert resp.status_code == 503
+    assert [i["id"] for i in client.get("/items").get_json()] == [i["id"] for i in created]
+    assert all(client.get(f"/items/{i['id']}").status_code == 200 for i in created)
+
+
+def test_bulk_changes_run_on_every_owning_shard(sharded_app):
+    client = sharded_app.test_client()
+    for n in range(6):
+        _create(client, f"Item{n}", n, 10, "bulk")
+    _create(client, "Other", 0, 10, "misc")
+
+    resp = client.patch("/items?category=bulk", json={"price": {"add": "0.5"}})
+    assert resp.get_json() == {"matched": 6, "updated": 6}
+    assert {i["price"] for i in client.get("/items?category=bulk").get_json()} == {10.5}
+
+    resp = client.delete("/items?category=bulk&quantity_lte=2")
+    assert resp.get_json() == {"matched": 3, "deleted": 3}
+    assert len(client.get("/items").get_json()) == 4
+
+
+def test_bulk_cap_applies_to_all_shards_together(tmp_path, monkeypatch):
+    app = _make_app(tmp_path, "id_range")
+    client = app.test_client()
+    for n in range(6):
+        _create(client, f"Item{n}", n, 10, "bulk")
+
+    # The count (one query per shard) sees no rows, as if they were added right after it:
+    # 2 per shard stay under the cap, 6 in total do not.
+    conditions = api._bulk_conditions
+    calls = itertools.count()
+    monkeypatch.setattr(
+        api,
+        "_bulk_conditions",
+        lambda session, bulk: [*conditions(session, bulk), false()] if next(calls) < 3 else conditions(session, bulk),
+    )
+    resp = client.patch("/items?category=bulk&max_rows=3", json={"price": {"set": 1}})
+    assert resp.status_code == 409
+    assert resp.get_json()["details"] == {"matched": 6, "max_rows": 3}
+    monkeypatch.undo()
+    # No shard committed.
+    assert {i["price"] for i in client.get("/items").get_json()} == {10}
+
+
+def test_report_rows_are_read_from_every_owning_shard(sharded_app):
+    client = sharded_app.test_client()
+    created = [_create(client, f"Item{n}", n, 10, "report") for n in range(5)]
+    _create(client, "Other", 1, 10, "misc")
+
+    with sharded_app.app_context():
+        rows = list(generate_report.iter_category_rows("report", batch_size=2))
+    assert [r[0] for r in rows] == sorted(i["id"] for i in created)
+    assert rows[0][1:] == ("Item0", 0, "10.00")
+
+
+def test_concurrent_scatters_do_not_queue_behind_each_other(sharded_app):
+    shards = sharded_app.extensions["shard_router"]
+    # Both requests' shard queries must run at the same time to pass the barrier.
+    barrier = threading.Barrier(2 * len(shards.engines), timeout=5)
+    results = []
+
+    def scatter():
+        results.append(shards.scatter(lambda session: barrier.wait()))
+
+    threads = [threading.Thread(target=scatter) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 2 and not barrier.broken
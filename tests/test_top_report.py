@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import text
+
+from app import api
+from app.extensions import db
+
+
+def _create(client, name, quantity, price, category):
+    client.post("/items", json={"name": name, "quantity": quantity, "price": price, "category": category})
+
+
+def test_top_by_value_and_quantity(client):
+    _create(client, "Laptop", 2, 1000, "electronics")
+    _create(client, "Mouse", 50, 10, "electronics")
+    _create(client, "Cable", 1, 5, "electronics")
+    _create(client, "Paper", 300, "4.99", "office")
+
+    data = client.get("/reports/top?by=value&n=2").get_json()
+    assert [(i["name"], i["value"]) for i in data["items"]] == [("Laptop", 2000.0), ("Paper", 1497.0)]
+
+    data = client.get("/reports/top?by=quantity&n=2&category=electronics&money=exact").get_json()
+    assert [(i["name"], i["value"]) for i in data["items"]] == [("Cable", "5.00"), ("Laptop", "2000.00")]
+
+    assert client.get("/reports/top?by=name").status_code == 400
+    assert client.get("/reports/top?n=0").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "by, category, index",
+    [
+        ("value", None, "ix_items_value_id"),
+        ("value", "electronics", "ix_items_category_id_value_id"),
+        ("quantity", None, "ix_items_quantity_id"),
+        ("quantity", "electronics", "ix_items_category_id_quantity_id"),
+    ],
+)
+def test_top_queries_scan_an_index_without_sorting(app, client, by, category, index):
+    _create(client, "Mouse", 5, 10, "electronics")
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            pytest.skip("EXPLAIN QUERY PLAN is SQLite syntax")
+        query = api._top_items_query(db.session, by, 10, category)
+        sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+        plan = " ".join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert index in plan
+    assert "TEMP B-TREE" not in plan